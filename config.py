@@ -58,6 +58,7 @@ RISK_CONFIG = {
 DATA_CONFIG = {
     "lookback_days": 30,
     "update_interval": 10,  # seconds
+    "cache_dir": "cache/ohlcv",  # OHLCV parquet cache (None to disable)
 }
 
 # Logging
@@ -65,5 +66,7 @@ LOG_CONFIG = {
     "level": "INFO",
     "file": "logs/trading.log",
     "console": True,
+    "max_bytes": 10 * 1024 * 1024,  # rotate after 10 MB
+    "backup_count": 3,
 }
 
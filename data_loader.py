@@ -3,11 +3,16 @@ Data Loader Module
 ماژول دریافت داده‌های بازار از صرافی
 """
 
+import asyncio
 import ccxt
+import ccxt.async_support as ccxt_async
+import ccxt.pro as ccxt_pro
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from pathlib import Path
 import time
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple, Callable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,19 +21,27 @@ logger = logging.getLogger(__name__)
 class DataLoader:
     """کلاس برای دریافت داده‌های بازار از صرافی‌ها"""
     
-    def __init__(self, exchange_name: str = "binance"):
+    def __init__(self, exchange_name: str = "binance",
+                 cache_dir: Optional[str] = "cache/ohlcv",
+                 async_mode: bool = False):
         """
         Initialize data loader
         
         Args:
             exchange_name: نام صرافی (binance, coinbase, etc.)
+            cache_dir: پوشه کش OHLCV (None برای غیرفعال کردن کش)
+            async_mode: استفاده از ccxt.async_support؛ در این حالت فقط
+                متدهای async (get_ohlcv_async, fetch_many, close) قابل استفاده‌اند
         
         Raises:
             AttributeError: اگر صرافی مورد نظر وجود نداشته باشد
         """
         self.exchange_name = exchange_name
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.async_mode = async_mode
+        self.live_df: Dict[str, pd.DataFrame] = {}
         try:
-            exchange_class = getattr(ccxt, exchange_name)
+            exchange_class = getattr(ccxt_async if async_mode else ccxt, exchange_name)
             self.exchange = exchange_class({
                 'enableRateLimit': True,
                 'options': {
@@ -80,16 +93,11 @@ class DataLoader:
             DataFrame with OHLCV data
         """
         try:
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days)
-            since = int(start_time.timestamp() * 1000)
+            since, end_ms, current_since, cached = self._prepare_fetch(symbol, timeframe, days)
             
-            all_candles = []
-            current_since = since
+            chunks: List[np.ndarray] = []
             batch = 0
             
-            logger.info(f"Fetching {days} days of {timeframe} data for {symbol}...")
-            
             while True:
                 try:
                     candles = self.exchange.fetch_ohlcv(
@@ -102,15 +110,16 @@ class DataLoader:
                     if not candles:
                         break
                     
-                    all_candles.extend(candles)
+                    chunk = np.asarray(candles, dtype=np.float64)
+                    chunks.append(chunk)
                     batch += 1
                     
-                    last_timestamp = candles[-1][0]
-                    if last_timestamp >= int(end_time.timestamp() * 1000):
+                    last_timestamp = int(chunk[-1, 0])
+                    if last_timestamp >= end_ms:
                         break
                     
+                    # Request pacing is left to ccxt's enableRateLimit
                     current_since = last_timestamp + 1
-                    time.sleep(0.5)  # Rate limit protection
                     
                     # Prevent infinite loop
                     if batch > 100:
@@ -125,21 +134,274 @@ class DataLoader:
                     time.sleep(5)
                     break  # Stop on repeated errors
             
-            # Convert to DataFrame
-            df = pd.DataFrame(
-                all_candles,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('datetime', inplace=True)
+            return self._finish_fetch(symbol, timeframe, since, end_ms, chunks, cached)
+            
+        except Exception as e:
+            logger.error(f"Error fetching OHLCV for {symbol}: {e}")
+            return pd.DataFrame()
+    
+    async def get_ohlcv_async(self, symbol: str, timeframe: str = "10m",
+                              days: int = 30, limit: int = 1000) -> pd.DataFrame:
+        """
+        دریافت داده‌های تاریخی OHLCV (نسخه async)
+        
+        Same as get_ohlcv, but requires ``async_mode=True``.
+        
+        Args:
+            symbol: نماد معاملاتی
+            timeframe: تایم فریم (1m, 5m, 10m, 1h, etc.)
+            days: تعداد روزهای تاریخی
+            limit: حداکثر تعداد کندل در هر درخواست
+            
+        Returns:
+            DataFrame with OHLCV data
+        """
+        try:
+            since, end_ms, current_since, cached = self._prepare_fetch(symbol, timeframe, days)
+            
+            chunks: List[np.ndarray] = []
+            batch = 0
+            
+            while True:
+                try:
+                    candles = await self.exchange.fetch_ohlcv(
+                        symbol,
+                        timeframe=timeframe,
+                        since=current_since,
+                        limit=limit
+                    )
+                    
+                    if not candles:
+                        break
+                    
+                    chunk = np.asarray(candles, dtype=np.float64)
+                    chunks.append(chunk)
+                    batch += 1
+                    
+                    last_timestamp = int(chunk[-1, 0])
+                    if last_timestamp >= end_ms:
+                        break
+                    
+                    current_since = last_timestamp + 1
+                    
+                    # Prevent infinite loop
+                    if batch > 100:
+                        logger.warning(f"Reached maximum batch limit (100) for {symbol}")
+                        break
+                    
+                except Exception as e:
+                    logger.error(f"Error in batch {batch} for {symbol}: {e}")
+                    if batch == 1:  # If first batch fails, retry once
+                        await asyncio.sleep(2)
+                        continue
+                    await asyncio.sleep(5)
+                    break  # Stop on repeated errors
             
-            logger.info(f"Fetched {len(df)} candles for {symbol}")
-            return df
+            return self._finish_fetch(symbol, timeframe, since, end_ms, chunks, cached)
             
         except Exception as e:
             logger.error(f"Error fetching OHLCV for {symbol}: {e}")
             return pd.DataFrame()
     
+    async def fetch_many(self, symbols: List[str], **kwargs) -> Dict[str, pd.DataFrame]:
+        """
+        دریافت همزمان OHLCV برای چند نماد
+        
+        Args:
+            symbols: لیست نمادهای معاملاتی
+            **kwargs: آرگومان‌های get_ohlcv_async
+            
+        Returns:
+            Dictionary mapping symbol to its OHLCV DataFrame
+        """
+        frames = await asyncio.gather(
+            *[self.get_ohlcv_async(symbol, **kwargs) for symbol in symbols]
+        )
+        return dict(zip(symbols, frames))
+    
+    async def stream_ohlcv(self, symbols: List[str], timeframe: str = "10m",
+                           on_candle: Optional[Callable[[str, list], None]] = None,
+                           days: int = 30) -> None:
+        """
+        دریافت زنده کندل‌ها از WebSocket (ccxt.pro)
+        
+        History is seeded into ``self.live_df`` from the cache/REST, then a
+        single kline subscription keeps every symbol's frame up to date.
+        ``on_candle(symbol, candle)`` is called after each update; the
+        updated history is ``self.live_df[symbol]``. Runs until cancelled.
+        
+        Args:
+            symbols: لیست نمادهای معاملاتی
+            timeframe: تایم فریم
+            on_candle: تابعی که بعد از هر کندل فراخوانی می‌شود
+            days: تعداد روزهای تاریخی اولیه
+        """
+        if self.async_mode:
+            history = await self.fetch_many(symbols, timeframe=timeframe, days=days)
+        else:
+            # A sync ccxt exchange is not thread-safe, so the concurrent
+            # history fetch goes through a temporary async loader
+            loader = DataLoader(self.exchange_name, self.cache_dir, async_mode=True)
+            try:
+                history = await loader.fetch_many(symbols, timeframe=timeframe, days=days)
+            finally:
+                await loader.close()
+        self.live_df.update(history)
+        
+        ws_exchange = getattr(ccxt_pro, self.exchange_name)({
+            'enableRateLimit': True,
+            'options': {
+                'defaultType': 'spot'
+            }
+        })
+        subscriptions = [[symbol, timeframe] for symbol in symbols]
+        try:
+            while True:
+                try:
+                    update = await ws_exchange.watch_ohlcv_for_symbols(subscriptions)
+                except ccxt.NetworkError as e:
+                    logger.warning(f"OHLCV stream interrupted: {e}")
+                    await asyncio.sleep(1)
+                    continue
+                
+                for symbol, by_timeframe in update.items():
+                    for candle in by_timeframe.get(timeframe, []):
+                        self._apply_candle(symbol, candle)
+                        if on_candle is not None:
+                            on_candle(symbol, candle)
+        finally:
+            await ws_exchange.close()
+    
+    def _apply_candle(self, symbol: str, candle: list) -> None:
+        """
+        اعمال یک کندل زنده روی self.live_df
+        
+        A candle with the last timestamp replaces that row (the candle is
+        still open); a newer one is appended; older ones are ignored.
+        """
+        timestamp = int(candle[0])
+        values = np.asarray(candle[1:6], dtype=np.float64)
+        df = self.live_df.get(symbol)
+        last_timestamp = int(df['timestamp'].iloc[-1]) if df is not None and not df.empty else None
+        
+        if last_timestamp is not None and timestamp == last_timestamp:
+            df.iloc[-1, 1:] = values
+        elif last_timestamp is None or timestamp > last_timestamp:
+            row = pd.DataFrame(
+                values[np.newaxis, :],
+                columns=['open', 'high', 'low', 'close', 'volume'],
+                index=pd.to_datetime([timestamp], unit='ms').rename('datetime')
+            )
+            row.insert(0, 'timestamp', np.array([timestamp], dtype=np.int64))
+            self.live_df[symbol] = row if last_timestamp is None else pd.concat([df, row])
+    
+    async def close(self) -> None:
+        """بستن اتصال async صرافی"""
+        if self.async_mode:
+            await self.exchange.close()
+    
+    def _prepare_fetch(self, symbol: str, timeframe: str,
+                       days: int) -> Tuple[int, int, int, Optional[pd.DataFrame]]:
+        """
+        محاسبه بازه دریافت داده با توجه به کش
+        
+        Returns:
+            (since, end_ms, first request timestamp, cached DataFrame or None)
+        """
+        end_time = datetime.now()
+        start_time = end_time - timedelta(days=days)
+        since = int(start_time.timestamp() * 1000)
+        end_ms = int(end_time.timestamp() * 1000)
+        current_since = since
+        
+        # Resume from the cache when it already covers the requested range.
+        # The last cached candle is fetched again since it may have been
+        # incomplete when it was stored.
+        cached = self._load_cache(symbol, timeframe)
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        if cached is not None and int(cached['timestamp'].iloc[0]) <= since + timeframe_ms:
+            current_since = int(cached['timestamp'].iloc[-1])
+            logger.info(f"Fetching {timeframe} data for {symbol} since last cached candle...")
+        else:
+            logger.info(f"Fetching {days} days of {timeframe} data for {symbol}...")
+        
+        return since, end_ms, current_since, cached
+    
+    def _finish_fetch(self, symbol: str, timeframe: str, since: int, end_ms: int,
+                      chunks: List[np.ndarray], cached: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """
+        ساخت DataFrame، ادغام با کش و ذخیره آن
+        
+        When nothing was fetched the cache is returned only if its last
+        candle reaches ``end_ms``; a stale cache gives an empty DataFrame.
+        """
+        # Convert to DataFrame from one typed float64 block
+        data = np.concatenate(chunks, axis=0) if chunks else np.empty((0, 6))
+        timestamps = data[:, 0].astype(np.int64)
+        df = pd.DataFrame(
+            data[:, 1:],
+            columns=['open', 'high', 'low', 'close', 'volume'],
+            index=pd.to_datetime(timestamps, unit='ms').rename('datetime')
+        )
+        df.insert(0, 'timestamp', timestamps)
+        
+        if cached is not None and not df.empty:
+            df = pd.concat([cached, df])
+            # Fetched rows may predate the cache; keep the index ascending
+            df = df[~df['timestamp'].duplicated(keep='last')].sort_index()
+        elif cached is not None:
+            # Every request failed or came back empty: do not pass old
+            # candles off as current data
+            last_ms = int(cached['timestamp'].iloc[-1])
+            timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+            if last_ms + timeframe_ms >= end_ms:
+                df = cached
+            else:
+                age = timedelta(seconds=(end_ms - last_ms) // 1000)
+                logger.warning(f"No candles fetched for {symbol}; ignoring cached data "
+                               f"whose last candle is {age} old")
+        
+        if not df.empty:
+            self._save_cache(symbol, timeframe, df)
+            df = df[df['timestamp'] >= since]
+        
+        logger.info(f"Fetched {len(df)} candles for {symbol}")
+        return df
+    
+    def _cache_path(self, symbol: str, timeframe: str) -> Optional[Path]:
+        """مسیر فایل کش برای یک نماد و تایم فریم"""
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / f"{symbol.replace('/', '_')}_{timeframe}.parquet"
+    
+    def _load_cache(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """
+        خواندن داده‌های کش شده
+        
+        Returns:
+            Cached OHLCV DataFrame, or None if there is no usable cache
+        """
+        cache_path = self._cache_path(symbol, timeframe)
+        if cache_path is None or not cache_path.exists():
+            return None
+        try:
+            cached = pd.read_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable OHLCV cache {cache_path}: {e}")
+            return None
+        return cached if not cached.empty else None
+    
+    def _save_cache(self, symbol: str, timeframe: str, df: pd.DataFrame) -> None:
+        """ذخیره داده‌ها در کش"""
+        cache_path = self._cache_path(symbol, timeframe)
+        if cache_path is None:
+            return
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path, compression='zstd')
+        except Exception as e:
+            logger.warning(f"Could not write OHLCV cache {cache_path}: {e}")
+    
     def get_orderbook(self, symbol: str, limit: int = 20) -> dict:
         """
         دریافت Order Book
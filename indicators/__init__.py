@@ -12,6 +12,15 @@ from .technical_indicators import (
     calculate_stochastic,
     detect_divergence,
     calculate_volume_profile,
+    calculate_rsi_np,
+    calculate_ema_np,
+    calculate_macd_np,
+    calculate_bollinger_bands_np,
+    calculate_atr_np,
+    calculate_stochastic_np,
+    rolling_mean_std,
+    rolling_mean_np,
+    rolling_minmax_np,
 )
 
 __all__ = [
@@ -23,5 +32,14 @@ __all__ = [
     'calculate_stochastic',
     'detect_divergence',
     'calculate_volume_profile',
+    'calculate_rsi_np',
+    'calculate_ema_np',
+    'calculate_macd_np',
+    'calculate_bollinger_bands_np',
+    'calculate_atr_np',
+    'calculate_stochastic_np',
+    'rolling_mean_std',
+    'rolling_mean_np',
+    'rolling_minmax_np',
 ]
 
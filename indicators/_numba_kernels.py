@@ -0,0 +1,265 @@
+"""
+Numba Kernels
+کرنل‌های عددی اندیکاتورها (Numba)
+
+Single-pass loops over float64 arrays. Warm-up positions (and windows
+holding NaN/inf) are NaN, matching the pandas rolling results the public
+wrappers used to return. _ema matches ``ewm(adjust=False).mean()`` only on
+input without interior NaN: a NaN here carries the previous EMA forward,
+while pandas (``ignore_na=False``) also decays the old value across the gap.
+"""
+
+import numpy as np
+from utils._njit import njit, array_signatures
+
+# Sliding-window updates between exact recomputations in _rolling_mean_std
+_WELFORD_RESEED = 256
+
+
+@njit(array_signatures(lambda t, arr: t.float64[::1](arr, t.int64)), cache=True)
+def _ema(values, period):
+    """EMA با adjust=False (مانند pandas ewm برای داده بدون NaN میانی)"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    alpha = 2.0 / (period + 1.0)
+
+    start = 0
+    while start < n and np.isnan(values[start]):
+        start += 1
+    if start == n:
+        return out
+
+    ema = values[start]
+    out[start] = ema
+    for i in range(start + 1, n):
+        x = values[i]
+        if not np.isnan(x):
+            ema = alpha * x + (1.0 - alpha) * ema
+        out[i] = ema
+    return out
+
+
+@njit(array_signatures(lambda t, arr: t.UniTuple(t.float64, 2)(arr, t.float64)),
+      cache=True)
+def _ema_last_two(values, alpha):
+    """
+    دو مقدار آخر EMA (adjust=False) بدون ساخت آرایه خروجی
+
+    Same recursion as _ema with a precomputed ``alpha``.
+
+    Returns:
+        (previous, last) EMA values
+    """
+    n = values.shape[0]
+    prev = np.nan
+    ema = np.nan
+    for i in range(n):
+        x = values[i]
+        prev = ema
+        if not np.isnan(x):
+            if np.isnan(ema):
+                ema = x
+            else:
+                ema = alpha * x + (1.0 - alpha) * ema
+    return prev, ema
+
+
+@njit(cache=True)
+def _rsi_value(avg_gain, avg_loss):
+    """RSI از میانگین سود و زیان"""
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+
+@njit(array_signatures(lambda t, arr: t.float64[::1](arr, t.int64)), cache=True)
+def _rsi(close, period):
+    """RSI با هموارسازی Wilder (EWMA با alpha=1/period)"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if n <= period:
+        return out
+
+    # Seed with the simple average of the first `period` changes
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        elif delta < 0:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+    out[period] = _rsi_value(avg_gain, avg_loss)
+
+    for i in range(period + 1, n):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+        out[i] = _rsi_value(avg_gain, avg_loss)
+    return out
+
+
+@njit(array_signatures(lambda t, arr: t.UniTuple(t.float64, 2)(arr, t.int64)),
+      cache=True)
+def _wilder_averages(close, period):
+    """
+    میانگین سود و زیان Wilder پس از آخرین قیمت
+
+    Ends in the state WilderRsiState reaches by updating with every value
+    of ``close``: during the warm-up (fewer than ``period`` changes) the
+    plain sums are returned.
+    """
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, close.shape[0]):
+        delta = close[i] - close[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        if i < period:
+            avg_gain += gain
+            avg_loss += loss
+        elif i == period:
+            avg_gain = (avg_gain + gain) / period
+            avg_loss = (avg_loss + loss) / period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+    return avg_gain, avg_loss
+
+
+@njit(cache=True)
+def _rolling_mean(values, period):
+    """میانگین متحرک ساده با جمع پیوسته"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    nan_count = 0
+
+    for i in range(n):
+        x = values[i]
+        if not np.isfinite(x):
+            nan_count += 1
+        else:
+            total += x
+        if i >= period:
+            y = values[i - period]
+            if not np.isfinite(y):
+                nan_count -= 1
+            else:
+                total -= y
+        if i >= period - 1 and nan_count == 0:
+            out[i] = total / period
+    return out
+
+
+@njit(cache=True)
+def _rolling_mean_std(values, period):
+    """
+    میانگین و انحراف معیار متحرک (ddof=1) در یک گذر
+
+    Uses a sliding Welford update, so the variance does not suffer from the
+    cancellation of a sum/sum-of-squares formulation on large prices. The
+    state is rebuilt from the raw window whenever a window becomes clean
+    again after holding NaN/inf, and every ``_WELFORD_RESEED`` bars to
+    bound the accumulated rounding drift.
+    """
+    n = values.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    m = 0.0
+    m2 = 0.0
+    valid = False
+    steps = 0
+    nan_count = 0
+
+    for i in range(n):
+        x = values[i]
+        if not np.isfinite(x):
+            nan_count += 1
+        if i >= period and not np.isfinite(values[i - period]):
+            nan_count -= 1
+        if i < period - 1 or nan_count > 0:
+            valid = False
+            continue
+
+        if valid and steps < _WELFORD_RESEED:
+            # Replace the oldest sample y with x
+            y = values[i - period]
+            delta = x - y
+            old_m = m
+            m += delta / period
+            m2 += delta * (x - m + y - old_m)
+            if m2 < 0.0:
+                m2 = 0.0
+            steps += 1
+        else:
+            m = 0.0
+            for j in range(i - period + 1, i + 1):
+                m += values[j]
+            m /= period
+            m2 = 0.0
+            for j in range(i - period + 1, i + 1):
+                d = values[j] - m
+                m2 += d * d
+            valid = True
+            steps = 0
+
+        mean[i] = m
+        if period > 1:
+            std[i] = np.sqrt(m2 / (period - 1))
+    return mean, std
+
+
+@njit(cache=True)
+def _rolling_minmax(high, low, window):
+    """بیشترین high و کمترین low متحرک با صف یکنوا"""
+    n = high.shape[0]
+    highest = np.full(n, np.nan)
+    lowest = np.full(n, np.nan)
+    max_q = np.empty(n, np.int64)
+    min_q = np.empty(n, np.int64)
+    max_head = 0
+    max_tail = 0
+    min_head = 0
+    min_tail = 0
+    high_nans = 0
+    low_nans = 0
+
+    for i in range(n):
+        h = high[i]
+        l = low[i]
+        if np.isnan(h):
+            high_nans += 1
+        else:
+            while max_tail > max_head and high[max_q[max_tail - 1]] <= h:
+                max_tail -= 1
+            max_q[max_tail] = i
+            max_tail += 1
+        if np.isnan(l):
+            low_nans += 1
+        else:
+            while min_tail > min_head and low[min_q[min_tail - 1]] >= l:
+                min_tail -= 1
+            min_q[min_tail] = i
+            min_tail += 1
+
+        if i >= window:
+            if np.isnan(high[i - window]):
+                high_nans -= 1
+            if np.isnan(low[i - window]):
+                low_nans -= 1
+        while max_tail > max_head and max_q[max_head] <= i - window:
+            max_head += 1
+        while min_tail > min_head and min_q[min_head] <= i - window:
+            min_head += 1
+
+        if i >= window - 1:
+            if high_nans == 0:
+                highest[i] = high[max_q[max_head]]
+            if low_nans == 0:
+                lowest[i] = low[min_q[min_head]]
+    return highest, lowest
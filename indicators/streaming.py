@@ -0,0 +1,304 @@
+"""
+Streaming Indicators
+اندیکاتورهای افزایشی برای اجرای زنده
+
+State objects that advance an indicator one bar at a time instead of
+recomputing it over the whole history on every tick. Bars passed to
+``update`` are "committed"; ``peek`` evaluates a bar (usually the still
+open last candle) without committing it.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from ._numba_kernels import _ema, _ema_last_two, _rsi_value, _wilder_averages
+
+
+def resume_position(index: pd.Index, close: np.ndarray, committed: int,
+                    last_ts, last_close: Optional[float]) -> int:
+    """
+    موقعیت آخرین کندل ثبت‌شده در داده‌های جدید
+
+    Args:
+        index: ایندکس زمانی کندل‌ها (صعودی)
+        close: آرایه قیمت بسته شدن
+        committed: تعداد کندل‌هایی که باید ثبت شوند
+        last_ts: زمان آخرین کندل ثبت‌شده
+        last_close: قیمت آخرین کندل ثبت‌شده
+
+    Returns:
+        Position of ``last_ts`` in ``index``, or -1 if the data does not
+        continue the committed history (the state must then be rebuilt)
+    """
+    if last_ts is None or committed <= 0:
+        return -1
+    pos = int(index.searchsorted(last_ts))
+    if pos >= committed or index[pos] != last_ts or close[pos] != last_close:
+        return -1
+    return pos
+
+
+class MacdCache:
+    """
+    MACD افزایشی
+    Keeps the fast/slow/signal EMA values of the last committed bar so a
+    new candle costs O(1). Values match calculate_macd on the same data.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        """
+        Initialize MACD state
+
+        Args:
+            fast: دوره EMA سریع
+            slow: دوره EMA کند
+            signal: دوره signal line
+        """
+        self.fast = fast
+        self.slow = slow
+        self.signal = signal
+        self._alpha_fast = 2.0 / (fast + 1.0)
+        self._alpha_slow = 2.0 / (slow + 1.0)
+        self._alpha_signal = 2.0 / (signal + 1.0)
+        self.reset()
+
+    def reset(self) -> None:
+        """پاک کردن وضعیت"""
+        self.ema_fast: Optional[float] = None
+        self.ema_slow: Optional[float] = None
+        self.macd_signal_ema: Optional[float] = None
+        self.last_ts = None
+        self.last_close: Optional[float] = None
+
+    def _step(self, close: float) -> Tuple[float, float, float]:
+        """EMAهای بعدی بدون ثبت در وضعیت"""
+        if self.ema_fast is None:
+            ema_fast = ema_slow = close
+            signal = 0.0
+        else:
+            ema_fast = self._alpha_fast * close + (1.0 - self._alpha_fast) * self.ema_fast
+            ema_slow = self._alpha_slow * close + (1.0 - self._alpha_slow) * self.ema_slow
+            macd = ema_fast - ema_slow
+            signal = self._alpha_signal * macd + (1.0 - self._alpha_signal) * self.macd_signal_ema
+        return ema_fast, ema_slow, signal
+
+    def update(self, close: float, ts=None) -> Tuple[float, float, float]:
+        """
+        ثبت یک کندل جدید
+
+        Args:
+            close: قیمت بسته شدن
+            ts: زمان کندل
+
+        Returns:
+            MACD line, Signal line, Histogram for this bar
+        """
+        if not np.isnan(close):
+            self.ema_fast, self.ema_slow, self.macd_signal_ema = self._step(close)
+            self.last_close = close
+        self.last_ts = ts
+        if self.ema_fast is None:
+            return np.nan, np.nan, np.nan
+        macd = self.ema_fast - self.ema_slow
+        return macd, self.macd_signal_ema, macd - self.macd_signal_ema
+
+    def peek(self, close: float) -> Tuple[float, float, float]:
+        """
+        محاسبه MACD برای کندل بعدی بدون ثبت آن
+
+        Returns:
+            MACD line, Signal line, Histogram
+        """
+        ema_fast, ema_slow, signal = self._step(close)
+        macd = ema_fast - ema_slow
+        return macd, signal, macd - signal
+
+    def seed(self, index: pd.Index, close: np.ndarray) -> None:
+        """
+        مقداردهی وضعیت از کل تاریخچه
+
+        Args:
+            index: ایندکس زمانی کندل‌ها
+            close: آرایه قیمت بسته شدن
+        """
+        self.reset()
+        if len(close) == 0:
+            return
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        ema_fast = _ema(close, self.fast)
+        ema_slow = _ema(close, self.slow)
+        signal = _ema(ema_fast - ema_slow, self.signal)
+        if np.isnan(ema_fast[-1]):
+            return
+        self.ema_fast = float(ema_fast[-1])
+        self.ema_slow = float(ema_slow[-1])
+        self.macd_signal_ema = float(signal[-1])
+        self.last_ts = index[-1]
+        self.last_close = float(close[-1])
+
+    def sync(self, index: pd.Index, close: np.ndarray) -> Tuple[float, float, float]:
+        """
+        همگام‌سازی با داده‌ها و محاسبه MACD آخرین کندل
+
+        Every bar except the last is committed; the last one may still be
+        open, so it is only peeked. If ``index`` does not continue the
+        committed history the state is rebuilt from scratch.
+
+        Args:
+            index: ایندکس زمانی کندل‌ها (صعودی)
+            close: آرایه قیمت بسته شدن
+
+        Returns:
+            MACD line, Signal line, Histogram for the last bar
+        """
+        committed = len(close) - 1
+        pos = resume_position(index, close, committed, self.last_ts, self.last_close)
+
+        if pos < 0:
+            self.seed(index[:committed], close[:committed])
+        else:
+            for i in range(pos + 1, committed):
+                self.update(close[i], index[i])
+
+        return self.peek(close[-1])
+
+
+class EmaState:
+    """
+    EMA افزایشی (adjust=False)
+    Same recursion as calculate_ema; NaN inputs carry the value forward.
+    """
+
+    def __init__(self, period: int, alpha: Optional[float] = None):
+        """
+        Initialize EMA state
+
+        Args:
+            period: دوره EMA
+            alpha: ضریب هموارسازی از پیش محاسبه‌شده (پیش‌فرض 2/(period+1))
+        """
+        self.period = period
+        self._alpha = 2.0 / (period + 1.0) if alpha is None else alpha
+        self._beta = 1.0 - self._alpha
+        self.reset()
+
+    def reset(self) -> None:
+        """پاک کردن وضعیت"""
+        self.ema: Optional[float] = None
+
+    def _step(self, x: float) -> Optional[float]:
+        """مقدار بعدی EMA بدون ثبت"""
+        if math.isnan(x):
+            return self.ema
+        if self.ema is None:
+            return x
+        return self._alpha * x + self._beta * self.ema
+
+    @property
+    def value(self) -> float:
+        """EMA آخرین کندل ثبت‌شده"""
+        return np.nan if self.ema is None else self.ema
+
+    def update(self, x: float) -> float:
+        """ثبت یک مقدار جدید"""
+        self.ema = self._step(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """EMA کندل بعدی بدون ثبت آن"""
+        ema = self._step(x)
+        return np.nan if ema is None else ema
+
+    def seed(self, values: np.ndarray) -> None:
+        """
+        مقداردهی وضعیت از کل تاریخچه
+
+        Same state as calling ``update`` on every value, computed by one
+        jitted pass.
+
+        Args:
+            values: آرایه مقادیر
+        """
+        _, last = _ema_last_two(np.ascontiguousarray(values, dtype=np.float64), self._alpha)
+        self.ema = None if math.isnan(last) else float(last)
+
+
+class WilderRsiState:
+    """
+    RSI افزایشی با هموارسازی Wilder
+    Bar-for-bar identical to calculate_rsi: the averages are seeded with the
+    mean of the first ``period`` changes.
+    """
+
+    def __init__(self, period: int = 14):
+        """
+        Initialize RSI state
+
+        Args:
+            period: دوره RSI
+        """
+        self.period = period
+        self.reset()
+
+    def reset(self) -> None:
+        """پاک کردن وضعیت"""
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _step(self, x: float) -> Tuple[int, float, float]:
+        """(count, avg_gain, avg_loss) بعدی بدون ثبت"""
+        if self.prev_close is None:
+            return 0, 0.0, 0.0
+        period = self.period
+        delta = x - self.prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        count = self.count + 1
+        if count < period:
+            # Warm-up: accumulate sums of the first changes
+            return count, self.avg_gain + gain, self.avg_loss + loss
+        if count == period:
+            return count, (self.avg_gain + gain) / period, (self.avg_loss + loss) / period
+        return (count, (self.avg_gain * (period - 1) + gain) / period,
+                (self.avg_loss * (period - 1) + loss) / period)
+
+    def _rsi(self, count: int, avg_gain: float, avg_loss: float) -> float:
+        if count < self.period:
+            return np.nan
+        return _rsi_value(avg_gain, avg_loss)
+
+    @property
+    def value(self) -> float:
+        """RSI آخرین کندل ثبت‌شده"""
+        return self._rsi(self.count, self.avg_gain, self.avg_loss)
+
+    def update(self, x: float) -> float:
+        """ثبت یک قیمت جدید"""
+        self.count, self.avg_gain, self.avg_loss = self._step(x)
+        self.prev_close = x
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """RSI کندل بعدی بدون ثبت آن"""
+        return self._rsi(*self._step(x))
+
+    def seed(self, close: np.ndarray) -> None:
+        """
+        مقداردهی وضعیت از کل تاریخچه
+
+        Same state as calling ``update`` on every price, computed by one
+        jitted pass.
+
+        Args:
+            close: آرایه قیمت بسته شدن
+        """
+        self.reset()
+        if len(close) == 0:
+            return
+        close = np.ascontiguousarray(close, dtype=np.float64)
+        self.avg_gain, self.avg_loss = _wilder_averages(close, self.period)
+        self.count = len(close) - 1
+        self.prev_close = float(close[-1])
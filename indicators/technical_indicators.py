@@ -5,51 +5,80 @@ Technical Indicators
 
 import pandas as pd
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Union
+from ._numba_kernels import (
+    _rsi, _ema, _rolling_mean, _rolling_mean_std, _rolling_minmax
+)
+from utils._njit import NUMBA_AVAILABLE
 
+try:
+    import bottleneck as bn
+except ImportError:  # pragma: no cover - depends on the environment
+    bn = None
 
-def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+# Indicator inputs: a Series gives Series results, an ndarray gives ndarrays
+ArrayLike = Union[pd.Series, np.ndarray]
+
+# Rolling means/stds/extremes go through bottleneck's C moving-window
+# functions when numba is missing (the kernels would then run as plain Python loops)
+USE_BOTTLENECK = bn is not None and not NUMBA_AVAILABLE
+
+
+def calculate_rsi(prices: ArrayLike, period: int = 14) -> ArrayLike:
     """
     محاسبه Relative Strength Index (RSI)
     
+    Uses Wilder's smoothing: the first value (at index ``period``) is the
+    simple average of the first ``period`` changes, later values follow
+    ``avg = (avg * (period - 1) + x) / period``.
+    
     Args:
-        prices: سری قیمت‌ها
+        prices: سری یا آرایه قیمت‌ها
         period: دوره محاسبه
         
     Returns:
         RSI values
     """
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    return rsi
+    if isinstance(prices, np.ndarray):
+        return calculate_rsi_np(prices, period)
+    rsi = calculate_rsi_np(prices.to_numpy(dtype=np.float64), period)
+    return pd.Series(rsi, index=prices.index, name=prices.name)
+
 
+def calculate_rsi_np(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI روی آرایه NumPy (مانند calculate_rsi)"""
+    return _rsi(np.ascontiguousarray(close, dtype=np.float64), period)
 
-def calculate_ema(prices: pd.Series, period: int) -> pd.Series:
+
+def calculate_ema(prices: ArrayLike, period: int) -> ArrayLike:
     """
     محاسبه Exponential Moving Average (EMA)
     
     Args:
-        prices: سری قیمت‌ها
+        prices: سری یا آرایه قیمت‌ها
         period: دوره محاسبه
         
     Returns:
         EMA values
     """
-    return prices.ewm(span=period, adjust=False).mean()
+    if isinstance(prices, np.ndarray):
+        return calculate_ema_np(prices, period)
+    ema = calculate_ema_np(prices.to_numpy(dtype=np.float64), period)
+    return pd.Series(ema, index=prices.index, name=prices.name)
+
 
+def calculate_ema_np(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA روی آرایه NumPy (مانند calculate_ema)"""
+    return _ema(np.ascontiguousarray(values, dtype=np.float64), period)
 
-def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26, 
-                   signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+
+def calculate_macd(prices: ArrayLike, fast: int = 12, slow: int = 26, 
+                   signal: int = 9) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
     """
     محاسبه MACD
     
     Args:
-        prices: سری قیمت‌ها
+        prices: سری یا آرایه قیمت‌ها
         fast: دوره EMA سریع
         slow: دوره EMA کند
         signal: دوره signal line
@@ -57,120 +86,261 @@ def calculate_macd(prices: pd.Series, fast: int = 12, slow: int = 26,
     Returns:
         MACD line, Signal line, Histogram
     """
-    ema_fast = calculate_ema(prices, fast)
-    ema_slow = calculate_ema(prices, slow)
-    macd_line = ema_fast - ema_slow
-    signal_line = calculate_ema(macd_line, signal)
-    histogram = macd_line - signal_line
+    if isinstance(prices, np.ndarray):
+        return calculate_macd_np(prices, fast, slow, signal)
+    macd_line, signal_line, histogram = calculate_macd_np(
+        prices.to_numpy(dtype=np.float64), fast, slow, signal
+    )
     
-    return macd_line, signal_line, histogram
+    index = prices.index
+    return (pd.Series(macd_line, index=index), pd.Series(signal_line, index=index),
+            pd.Series(histogram, index=index))
+
 
+def calculate_macd_np(close: np.ndarray, fast: int = 12, slow: int = 26,
+                      signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD روی آرایه NumPy (مانند calculate_macd)"""
+    values = np.ascontiguousarray(close, dtype=np.float64)
+    macd_line = _ema(values, fast) - _ema(values, slow)
+    signal_line = _ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
 
-def calculate_bollinger_bands(prices: pd.Series, period: int = 20, 
-                               std_dev: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
+
+def calculate_bollinger_bands(prices: ArrayLike, period: int = 20, 
+                               std_dev: float = 2.0) -> Tuple[ArrayLike, ArrayLike, ArrayLike]:
     """
     محاسبه Bollinger Bands
     
     Args:
-        prices: سری قیمت‌ها
+        prices: سری یا آرایه قیمت‌ها
         period: دوره محاسبه
         std_dev: انحراف معیار
         
     Returns:
         Upper band, Middle band (SMA), Lower band
     """
-    middle = prices.rolling(window=period).mean()
-    std = prices.rolling(window=period).std()
-    upper = middle + (std * std_dev)
-    lower = middle - (std * std_dev)
+    if isinstance(prices, np.ndarray):
+        return calculate_bollinger_bands_np(prices, period, std_dev)
+    upper, middle, lower = calculate_bollinger_bands_np(
+        prices.to_numpy(dtype=np.float64), period, std_dev
+    )
     
-    return upper, middle, lower
+    index = prices.index
+    return (pd.Series(upper, index=index), pd.Series(middle, index=index),
+            pd.Series(lower, index=index))
+
+
+def calculate_bollinger_bands_np(close: np.ndarray, period: int = 20,
+                                 std_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger Bands روی آرایه NumPy (مانند calculate_bollinger_bands)"""
+    mean, std = rolling_mean_std(close, period)
+    return mean + (std * std_dev), mean, mean - (std * std_dev)
 
 
-def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, 
-                  period: int = 14) -> pd.Series:
+def rolling_mean_std(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    میانگین و انحراف معیار متحرک (ddof=1) در یک گذر O(n)
+    
+    Args:
+        values: آرایه مقادیر
+        period: طول پنجره
+        
+    Returns:
+        Rolling mean, rolling std
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if USE_BOTTLENECK:
+        values = np.where(np.isfinite(values), values, np.nan)
+        return (bn.move_mean(values, period, min_count=period),
+                bn.move_std(values, period, min_count=period, ddof=1))
+    return _rolling_mean_std(values, period)
+
+
+def rolling_mean_np(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    میانگین متحرک ساده روی آرایه NumPy
+    
+    Args:
+        values: آرایه مقادیر
+        window: طول پنجره
+        
+    Returns:
+        Rolling mean (NaN while the window is incomplete or holds NaN/inf)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if USE_BOTTLENECK:
+        values = np.where(np.isfinite(values), values, np.nan)
+        return bn.move_mean(values, window, min_count=window)
+    return _rolling_mean(values, window)
+
+
+def rolling_minmax_np(high: np.ndarray, low: np.ndarray,
+                      window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    بیشینه متحرک high و کمینه متحرک low روی آرایه‌های NumPy
+    
+    Args:
+        high: آرایه بالاترین قیمت
+        low: آرایه پایین‌ترین قیمت
+        window: طول پنجره
+        
+    Returns:
+        Rolling max of ``high``, rolling min of ``low`` (NaN while the
+        window is incomplete or holds NaN)
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    if USE_BOTTLENECK:
+        return (bn.move_max(high, window, min_count=window),
+                bn.move_min(low, window, min_count=window))
+    return _rolling_minmax(high, low, window)
+
+
+def calculate_atr(high: ArrayLike, low: ArrayLike, close: ArrayLike, 
+                  period: int = 14) -> ArrayLike:
     """
     محاسبه Average True Range (ATR)
     
     Args:
-        high: سری بالاترین قیمت
-        low: سری پایین‌ترین قیمت
-        close: سری قیمت بسته شدن
+        high: سری یا آرایه بالاترین قیمت
+        low: سری یا آرایه پایین‌ترین قیمت
+        close: سری یا آرایه قیمت بسته شدن
         period: دوره محاسبه
         
     Returns:
         ATR values
     """
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
+    if isinstance(close, np.ndarray):
+        return calculate_atr_np(high, low, close, period)
+    atr = calculate_atr_np(
+        high.to_numpy(dtype=np.float64),
+        low.to_numpy(dtype=np.float64),
+        close.to_numpy(dtype=np.float64),
+        period,
+    )
+    return pd.Series(atr, index=close.index)
+
+
+def calculate_atr_np(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     period: int = 14) -> np.ndarray:
+    """ATR روی آرایه‌های NumPy (مانند calculate_atr)"""
+    tr = _true_range(
+        np.asarray(high, dtype=np.float64),
+        np.asarray(low, dtype=np.float64),
+        np.asarray(close, dtype=np.float64),
+    )
+    return rolling_mean_np(tr, period)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    محاسبه True Range روی آرایه‌های NumPy
     
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=period).mean()
+    Args:
+        high: آرایه بالاترین قیمت
+        low: آرایه پایین‌ترین قیمت
+        close: آرایه قیمت بسته شدن
+        
+    Returns:
+        True range values
+    """
+    # One shifted close buffer; each |x - prev_close| is written into the
+    # same scratch array instead of allocating temporaries
+    prev_close = np.empty_like(close)
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    scratch = np.empty_like(close)
     
-    return atr
+    tr = high - low
+    # fmax skips the missing previous close of the first bar
+    np.subtract(high, prev_close, out=scratch)
+    np.abs(scratch, out=scratch)
+    np.fmax(tr, scratch, out=tr)
+    np.subtract(low, prev_close, out=scratch)
+    np.abs(scratch, out=scratch)
+    np.fmax(tr, scratch, out=tr)
+    return tr
 
 
-def calculate_stochastic(high: pd.Series, low: pd.Series, close: pd.Series,
-                         k_period: int = 14, d_period: int = 3) -> Tuple[pd.Series, pd.Series]:
+def calculate_stochastic(high: ArrayLike, low: ArrayLike, close: ArrayLike,
+                         k_period: int = 14, d_period: int = 3) -> Tuple[ArrayLike, ArrayLike]:
     """
     محاسبه Stochastic Oscillator
     
     Args:
-        high: سری بالاترین قیمت
-        low: سری پایین‌ترین قیمت
-        close: سری قیمت بسته شدن
+        high: سری یا آرایه بالاترین قیمت
+        low: سری یا آرایه پایین‌ترین قیمت
+        close: سری یا آرایه قیمت بسته شدن
         k_period: دوره %K
         d_period: دوره %D
         
     Returns:
         %K, %D
     """
-    lowest_low = low.rolling(window=k_period).min()
-    highest_high = high.rolling(window=k_period).max()
+    if isinstance(close, np.ndarray):
+        return calculate_stochastic_np(high, low, close, k_period, d_period)
+    k, d = calculate_stochastic_np(
+        high.to_numpy(dtype=np.float64),
+        low.to_numpy(dtype=np.float64),
+        close.to_numpy(dtype=np.float64),
+        k_period,
+        d_period,
+    )
+    return pd.Series(k, index=close.index), pd.Series(d, index=close.index)
+
+
+def calculate_stochastic_np(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                            k_period: int = 14, d_period: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic روی آرایه‌های NumPy (مانند calculate_stochastic)"""
+    highest_high, lowest_low = rolling_minmax_np(high, low, k_period)
     
-    k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-    d = k.rolling(window=d_period).mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100 * ((np.asarray(close, dtype=np.float64) - lowest_low) / (highest_high - lowest_low))
+    d = rolling_mean_np(k, d_period)
     
     return k, d
 
 
-def detect_divergence(prices: pd.Series, indicator: pd.Series, 
-                     lookback: int = 10) -> Optional[str]:
+def detect_divergence(prices: ArrayLike,
+                      indicator: ArrayLike,
+                      lookback: int = 10) -> Optional[str]:
     """
     تشخیص واگرایی (Divergence)
     
     Args:
-        prices: سری قیمت‌ها
-        indicator: سری اندیکاتور (مثلاً RSI)
+        prices: سری یا آرایه قیمت‌ها
+        indicator: سری یا آرایه اندیکاتور (مثلاً RSI)
         lookback: تعداد کندل‌های بررسی
         
     Returns:
         'bullish', 'bearish', or None
     """
-    if len(prices) < lookback * 2:
+    if lookback < 2 or len(prices) < lookback * 2:
         return None
     
-    recent_prices = prices.iloc[-lookback:]
-    recent_indicator = indicator.iloc[-lookback:]
-    
-    # Check for bullish divergence
-    price_lows = recent_prices.nsmallest(2)
-    indicator_lows = recent_indicator.loc[price_lows.index]
+    recent_prices = np.asarray(prices, dtype=np.float64)[-lookback:]
+    recent_indicator = np.asarray(indicator, dtype=np.float64)[-lookback:]
     
-    if len(price_lows) >= 2 and len(indicator_lows) >= 2:
-        if price_lows.iloc[-1] > price_lows.iloc[-2] and \
-           indicator_lows.iloc[-1] < indicator_lows.iloc[-2]:
-            return 'bullish'
+    # argmin/argmax return the first occurrence, which keeps the tie order
+    # of nsmallest/nlargest(keep='first')
+    masked = recent_prices.copy()
     
-    # Check for bearish divergence
-    price_highs = recent_prices.nlargest(2)
-    indicator_highs = recent_indicator.loc[price_highs.index]
+    # Check for bullish divergence (lowest price vs second lowest)
+    lowest = np.argmin(masked)
+    masked[lowest] = np.inf
+    second_low = np.argmin(masked)
+    if recent_prices[second_low] > recent_prices[lowest] and \
+       recent_indicator[second_low] < recent_indicator[lowest]:
+        return 'bullish'
     
-    if len(price_highs) >= 2 and len(indicator_highs) >= 2:
-        if price_highs.iloc[-1] < price_highs.iloc[-2] and \
-           indicator_highs.iloc[-1] > indicator_highs.iloc[-2]:
-            return 'bearish'
+    # Check for bearish divergence (highest price vs second highest)
+    masked[:] = recent_prices
+    highest = np.argmax(masked)
+    masked[highest] = -np.inf
+    second_high = np.argmax(masked)
+    if recent_prices[second_high] < recent_prices[highest] and \
+       recent_indicator[second_high] > recent_indicator[highest]:
+        return 'bearish'
     
     return None
 
@@ -186,27 +356,41 @@ def calculate_volume_profile(df: pd.DataFrame, bins: int = 20) -> dict:
     Returns:
         Dictionary with volume profile data
     """
-    price_range = df['high'].max() - df['low'].min()
-    bin_size = price_range / bins
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
     
     volume_profile = {}
+    poc = None
     
-    for _, row in df.iterrows():
-        price_min = row['low']
-        price_max = row['high']
-        volume = row['volume']
+    if len(df) > 0:
+        price_min = df['low'].min()
+        bin_size = (df['high'].max() - price_min) / bins
+        bin_prices = price_min + np.arange(bins) * bin_size
+        
+        # weights[row, i] is what the row adds to bin i; flattening it
+        # row-major gives the per-row, per-bin visit order of the loop
+        covered = (low[:, None] <= bin_prices) & (bin_prices <= high[:, None])
+        weights = np.where(covered, volume[:, None], 0.0)
+        
+        # Bins with equal prices (a flat range) share one key, as in a dict
+        keys, group = np.unique(bin_prices, return_inverse=True)
+
+        # Insert keys in the order the loop first touched them; cumsum adds
+        # sequentially, so totals match the loop's running sums exactly
+        order = []
+        for k in range(keys.size):
+            cols = np.flatnonzero(group == k)
+            cells = covered[:, cols].ravel()
+            if cells.any():
+                row = np.flatnonzero(cells)[0] // cols.size
+                order.append((row, cols[0], k, cols))
+        for _, _, k, cols in sorted(order, key=lambda item: item[:2]):
+            volume_profile[float(keys[k])] = float(np.cumsum(weights[:, cols].ravel())[-1])
         
-        # Distribute volume across price bins
-        for i in range(bins):
-            bin_price = df['low'].min() + (i * bin_size)
-            if price_min <= bin_price <= price_max:
-                volume_profile[bin_price] = volume_profile.get(bin_price, 0) + volume
-    
-    # Find POC (Point of Control) - price with highest volume
-    if volume_profile:
-        poc = max(volume_profile, key=volume_profile.get)
-    else:
-        poc = None
+        # Find POC (Point of Control) - price with highest volume
+        if volume_profile:
+            poc = max(volume_profile, key=volume_profile.get)
     
     return {
         'profile': volume_profile,
@@ -4,10 +4,13 @@ Main Entry Point
 """
 
 import sys
-import os
+import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, List
 from data_loader import DataLoader
 from strategies.volume_breakout import VolumeBreakoutStrategy
 from strategies.rsi_divergence import RSIDivergenceStrategy
@@ -16,21 +19,57 @@ from strategies.ema_crossover import EMACrossoverStrategy
 import config
 
 # Ensure logs directory exists
-log_dir = Path('logs')
-log_dir.mkdir(exist_ok=True)
-
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, config.LOG_CONFIG.get('level', 'INFO'), logging.INFO),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_dir / config.LOG_CONFIG.get('file', 'trading.log')),
-        logging.StreamHandler() if config.LOG_CONFIG.get('console', True) else logging.NullHandler()
-    ]
-)
+log_file = Path(config.LOG_CONFIG.get('file', 'logs/trading.log'))
+log_file.parent.mkdir(parents=True, exist_ok=True)
+
+# Setup logging: records are only enqueued on the calling thread; a
+# QueueListener thread does the file/console writes
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=config.LOG_CONFIG.get('max_bytes', 10 * 1024 * 1024),
+        backupCount=config.LOG_CONFIG.get('backup_count', 3),
+        encoding='utf-8'
+    ),
+    logging.StreamHandler() if config.LOG_CONFIG.get('console', True) else logging.NullHandler()
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+root_logger = logging.getLogger()
+root_logger.setLevel(getattr(logging, config.LOG_CONFIG.get('level', 'INFO'), logging.INFO))
+root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
 logger = logging.getLogger(__name__)
 
+# Strategies are built once at import and reused by every test_strategies call
+_STRATEGY_SPECS = [
+    ("Volume Breakout", VolumeBreakoutStrategy, {
+        'volume_multiplier': config.STRATEGY_CONFIG.get('volume_multiplier', 2.0)
+    }),
+    ("RSI Divergence", RSIDivergenceStrategy, {
+        'rsi_period': config.STRATEGY_CONFIG.get('rsi_period', 14),
+        'rsi_oversold': config.STRATEGY_CONFIG.get('rsi_oversold', 30),
+        'rsi_overbought': config.STRATEGY_CONFIG.get('rsi_overbought', 70)
+    }),
+    ("Bollinger Squeeze", BollingerSqueezeStrategy, {
+        'bb_period': config.STRATEGY_CONFIG.get('bb_period', 20),
+        'bb_std': config.STRATEGY_CONFIG.get('bb_std', 2.0),
+        'atr_period': config.STRATEGY_CONFIG.get('atr_period', 14)
+    }),
+    ("EMA Crossover", EMACrossoverStrategy, {
+        'fast_period': config.STRATEGY_CONFIG.get('ema_fast', 5),
+        'slow_period': config.STRATEGY_CONFIG.get('ema_slow', 20)
+    }),
+]
+STRATEGIES = [(name, cls(**params)) for name, cls, params in _STRATEGY_SPECS]
+
 
 def test_data_loader(symbol: str = "SOL/USDT") -> Optional:
     """
@@ -47,7 +86,10 @@ def test_data_loader(symbol: str = "SOL/USDT") -> Optional:
     print("="*60)
     
     try:
-        loader = DataLoader(exchange_name=config.EXCHANGE)
+        loader = DataLoader(
+            exchange_name=config.EXCHANGE,
+            cache_dir=config.DATA_CONFIG.get('cache_dir', 'cache/ohlcv')
+        )
         
         # Test ticker
         print(f"\n1. Testing ticker fetch for {symbol}...")
@@ -80,6 +122,28 @@ def test_data_loader(symbol: str = "SOL/USDT") -> Optional:
         return None
 
 
+async def fetch_all_ohlcv(symbols: List[str], days: int = 7) -> Dict:
+    """
+    دریافت همزمان داده‌های چند نماد
+    
+    Args:
+        symbols: لیست نمادهای معاملاتی
+        days: تعداد روزهای تاریخی
+        
+    Returns:
+        Dictionary mapping symbol to its OHLCV DataFrame
+    """
+    loader = DataLoader(
+        exchange_name=config.EXCHANGE,
+        cache_dir=config.DATA_CONFIG.get('cache_dir', 'cache/ohlcv'),
+        async_mode=True
+    )
+    try:
+        return await loader.fetch_many(symbols, timeframe=config.TIMEFRAME, days=days)
+    finally:
+        await loader.close()
+
+
 def test_strategies(df) -> None:
     """
     تست استراتژی‌ها
@@ -98,59 +162,39 @@ def test_strategies(df) -> None:
     print("Testing Strategies...")
     print("="*60)
     
-    strategies = [
-        ("Volume Breakout", VolumeBreakoutStrategy(
-            volume_multiplier=config.STRATEGY_CONFIG.get('volume_multiplier', 2.0)
-        )),
-        ("RSI Divergence", RSIDivergenceStrategy(
-            rsi_period=config.STRATEGY_CONFIG.get('rsi_period', 14),
-            rsi_oversold=config.STRATEGY_CONFIG.get('rsi_oversold', 30),
-            rsi_overbought=config.STRATEGY_CONFIG.get('rsi_overbought', 70)
-        )),
-        ("Bollinger Squeeze", BollingerSqueezeStrategy(
-            bb_period=config.STRATEGY_CONFIG.get('bb_period', 20),
-            bb_std=config.STRATEGY_CONFIG.get('bb_std', 2.0),
-            atr_period=config.STRATEGY_CONFIG.get('atr_period', 14)
-        )),
-        ("EMA Crossover", EMACrossoverStrategy(
-            fast_period=config.STRATEGY_CONFIG.get('ema_fast', 5),
-            slow_period=config.STRATEGY_CONFIG.get('ema_slow', 20)
-        )),
-    ]
-    
     signals_found = 0
-    for name, strategy in strategies:
+    for name, strategy in STRATEGIES:
         print(f"\n{name}:")
         try:
-            signal = strategy.generate_signal(df.copy())
+            signal = strategy.generate_signal(df)
             if signal:
                 signals_found += 1
-                signal_type = signal['signal'].upper()
+                signal_type = signal.signal.upper()
                 emoji = "🟢" if signal_type == "LONG" else "🔴"
                 print(f"   {emoji} Signal: {signal_type}")
-                print(f"   💵 Entry: ${signal['entry_price']:.4f}")
-                print(f"   🛑 Stop Loss: ${signal['stop_loss']:.4f}")
-                print(f"   🎯 Take Profit: ${signal['take_profit']:.4f}")
-                print(f"   📊 Confidence: {signal['confidence']:.1%}")
+                print(f"   💵 Entry: ${signal.entry_price:.4f}")
+                print(f"   🛑 Stop Loss: ${signal.stop_loss:.4f}")
+                print(f"   🎯 Take Profit: ${signal.take_profit:.4f}")
+                print(f"   📊 Confidence: {signal.confidence:.1%}")
                 
                 # Calculate risk/reward ratio
-                risk = abs(signal['entry_price'] - signal['stop_loss'])
-                reward = abs(signal['take_profit'] - signal['entry_price'])
+                risk = abs(signal.entry_price - signal.stop_loss)
+                reward = abs(signal.take_profit - signal.entry_price)
                 rr_ratio = reward / risk if risk > 0 else 0
                 print(f"   ⚖️  Risk/Reward: 1:{rr_ratio:.2f}")
                 
                 # Show additional info if available
-                if 'volume_ratio' in signal:
-                    print(f"   📈 Volume Ratio: {signal['volume_ratio']:.2f}x")
-                if 'rsi' in signal:
-                    print(f"   📉 RSI: {signal['rsi']:.2f}")
+                if hasattr(signal, 'volume_ratio'):
+                    print(f"   📈 Volume Ratio: {signal.volume_ratio:.2f}x")
+                if hasattr(signal, 'rsi'):
+                    print(f"   📉 RSI: {signal.rsi:.2f}")
             else:
                 print("   ⚪ No signal generated")
         except Exception as e:
             logger.error(f"Error testing {name}: {e}", exc_info=True)
             print(f"   ✗ Error: {e}")
     
-    print(f"\n📊 Summary: {signals_found}/{len(strategies)} strategies generated signals")
+    print(f"\n📊 Summary: {signals_found}/{len(STRATEGIES)} strategies generated signals")
 
 
 def main():
@@ -172,6 +216,14 @@ def main():
             test_strategies(df)
         else:
             print("\n⚠ Cannot proceed with strategy testing due to data loading failure")
+        
+        # Remaining pairs are fetched concurrently
+        other_pairs = [s for s in config.TRADING_PAIRS if s != test_symbol]
+        if other_pairs:
+            pair_data = asyncio.run(fetch_all_ohlcv(other_pairs, days=7))
+            for symbol, pair_df in pair_data.items():
+                print(f"\n📈 {symbol}: {len(pair_df)} candles")
+                test_strategies(pair_df)
     
     except KeyboardInterrupt:
         print("\n\n⚠ Interrupted by user")
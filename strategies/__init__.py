@@ -3,15 +3,22 @@ Trading Strategies Module
 ماژول استراتژی‌های معاملاتی
 """
 
-from .volume_breakout import VolumeBreakoutStrategy
-from .rsi_divergence import RSIDivergenceStrategy
-from .bollinger_squeeze import BollingerSqueezeStrategy
-from .ema_crossover import EMACrossoverStrategy
+from .base_strategy import SIGNAL_DTYPE, SIGNAL_FIELDS
+from .volume_breakout import VolumeBreakoutStrategy, VolumeBreakoutSignal
+from .rsi_divergence import RSIDivergenceStrategy, RSIDivergenceSignal
+from .bollinger_squeeze import BollingerSqueezeStrategy, BollingerSqueezeSignal
+from .ema_crossover import EMACrossoverStrategy, EMACrossoverSignal
 
 __all__ = [
     'VolumeBreakoutStrategy',
     'RSIDivergenceStrategy',
     'BollingerSqueezeStrategy',
     'EMACrossoverStrategy',
+    'VolumeBreakoutSignal',
+    'RSIDivergenceSignal',
+    'BollingerSqueezeSignal',
+    'EMACrossoverSignal',
+    'SIGNAL_DTYPE',
+    'SIGNAL_FIELDS',
 ]
 
@@ -0,0 +1,100 @@
+"""
+Indicator Cache
+کش اندیکاتورهای مشترک بین استراتژی‌ها
+
+Per-frame cache of derived arrays, so strategies evaluated on the same bar
+share the OHLCV arrays and common indicators instead of each recomputing
+them. Entries are keyed by ``id(df)`` and dropped when the frame is garbage
+collected. ``df.attrs`` is not used: pandas copies attrs into every derived
+frame (``iloc`` slices included), which costs a deep copy per slice and
+hands another bar's values to the slice.
+"""
+
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# id(df) -> (bar key, {cache key: value})
+_CACHE: Dict[int, Tuple[Optional[tuple], Dict[Hashable, Any]]] = {}
+
+
+def bar_key(df: pd.DataFrame) -> Optional[tuple]:
+    """
+    کلید کندل آخر
+
+    The open candle is updated in place (same length and timestamp), so
+    the last close and volume are part of the key; any trade that moves
+    the high/low also changes the volume.
+    """
+    if len(df) == 0:
+        return None
+    index = df.index
+    return (len(df), index[0], index[-1], df['close'].iat[-1], df['volume'].iat[-1])
+
+
+def bind(df: pd.DataFrame, key: Optional[tuple]) -> None:
+    """
+    اعتبارسنجی کش یک DataFrame برای کندل فعلی
+
+    Cached values survive only while the frame's bar key is unchanged;
+    get_or_compute checks the key on every call.
+
+    Args:
+        df: DataFrame با داده‌های OHLCV
+        key: کلید کندل آخر (bar_key)
+    """
+    frame_id = id(df)
+    entry = _CACHE.get(frame_id)
+    if entry is None:
+        weakref.finalize(df, _CACHE.pop, frame_id, None)
+    elif entry[0] == key:
+        return
+    _CACHE[frame_id] = (key, {})
+
+
+def get_or_compute(df: pd.DataFrame, key: Hashable, fn: Callable[[], Any]) -> Any:
+    """
+    خواندن مقدار کش‌شده یا محاسبه و ذخیره آن
+
+    Cached arrays are shared between strategies and must be treated as
+    read-only.
+
+    Args:
+        df: DataFrame با داده‌های OHLCV
+        key: کلید اندیکاتور، مثلاً ('ema', 20)
+        fn: تابع محاسبه در صورت نبود مقدار
+
+    Returns:
+        Cached or freshly computed value
+    """
+    # Re-checked on every call: frames such as DataLoader.live_df are
+    # updated in place between evaluations
+    frame_key = bar_key(df)
+    entry = _CACHE.get(id(df))
+    if entry is None or entry[0] != frame_key:
+        bind(df, frame_key)
+        entry = _CACHE[id(df)]
+    values = entry[1]
+    try:
+        return values[key]
+    except KeyError:
+        value = values[key] = fn()
+        return value
+
+
+def ohlcv_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    آرایه‌های float64 ستون‌های close, high, low, volume
+
+    The arrays are C-contiguous, as the signature-typed kernels require;
+    columns that are strided views (pandas 2.x frames built from a 2-D
+    slice) are copied.
+
+    Returns:
+        close, high, low, volume
+    """
+    return get_or_compute(df, ('ohlcv',), lambda: tuple(
+        np.ascontiguousarray(df[column].to_numpy(dtype=np.float64))
+        for column in ('close', 'high', 'low', 'volume')
+    ))
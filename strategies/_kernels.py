@@ -0,0 +1,300 @@
+"""
+Strategy Kernels
+کرنل‌های عددی استراتژی‌ها
+
+Fused Numba kernels that compute, in one call on raw NumPy arrays, only
+the scalars a strategy reads for the last bar.
+"""
+
+import numpy as np
+from utils._njit import njit, prange, array_signatures
+from indicators._numba_kernels import _ema_last_two
+
+# Windows used by BollingerSqueezeStrategy
+SQUEEZE_AVG_WINDOW = 15
+SQUEEZE_VOLUME_WINDOW = 10
+
+
+# Compiled squeeze kernels shared by strategies with the same parameters
+_SQUEEZE_KERNELS = {}
+
+
+def make_squeeze_kernel(bb_period: int, bb_std: float, atr_period: int):
+    """
+    ساخت کرنل فشردگی بولینجر برای پارامترهای ثابت
+
+    The parameters are captured by the closure, so numba compiles them as
+    constants. Kernels are kept per ``(bb_period, bb_std, atr_period)``;
+    the explicit signatures compile each one here, at strategy
+    construction, and ``cache=True`` stores it on disk keyed by the
+    captured values, so later processes load it instead of compiling.
+    The returned function takes C-contiguous ``(close, high, low, volume)``
+    float64 arrays holding at least ``max(bb_period, atr_period + 1) + 14``
+    bars and returns ``(upper, lower, bb_width, avg_bb_width, atr, avg_atr,
+    volume_ma)`` for the last bar.
+
+    Args:
+        bb_period: دوره باندهای بولینجر
+        bb_std: انحراف معیار
+        atr_period: دوره ATR
+
+    Returns:
+        Compiled kernel
+    """
+    key = (int(bb_period), float(bb_std), int(atr_period))
+    kernel = _SQUEEZE_KERNELS.get(key)
+    if kernel is not None:
+        return kernel
+
+    period, std_dev, atr_len = key
+    avg_window = SQUEEZE_AVG_WINDOW
+    volume_window = SQUEEZE_VOLUME_WINDOW
+
+    @njit(array_signatures(lambda t, arr: t.UniTuple(t.float64, 7)(arr, arr, arr, arr)),
+          cache=True)
+    def squeeze_kernel(close, high, low, volume):
+        n = close.shape[0]
+
+        # Bollinger bands and band width over the last `avg_window` bars
+        upper = 0.0
+        lower = 0.0
+        width_sum = 0.0
+        for j in range(avg_window):
+            end = n - avg_window + j + 1
+            mean = 0.0
+            for i in range(end - period, end):
+                mean += close[i]
+            mean /= period
+            var = 0.0
+            for i in range(end - period, end):
+                d = close[i] - mean
+                var += d * d
+            std = np.sqrt(var / (period - 1))
+            upper = mean + std * std_dev
+            lower = mean - std * std_dev
+            width_sum += (upper - lower) / close[end - 1]
+        bb_width = (upper - lower) / close[n - 1]
+
+        # ATR over the last `avg_window` bars
+        atr = 0.0
+        atr_sum = 0.0
+        for j in range(avg_window):
+            end = n - avg_window + j + 1
+            tr_sum = 0.0
+            for i in range(end - atr_len, end):
+                prev_close = close[i - 1]
+                tr_sum += max(high[i] - low[i], abs(high[i] - prev_close),
+                              abs(low[i] - prev_close))
+            atr = tr_sum / atr_len
+            atr_sum += atr
+
+        volume_sum = 0.0
+        for i in range(n - volume_window, n):
+            volume_sum += volume[i]
+
+        return (upper, lower, bb_width, width_sum / avg_window,
+                atr, atr_sum / avg_window, volume_sum / volume_window)
+
+    _SQUEEZE_KERNELS[key] = squeeze_kernel
+    return squeeze_kernel
+
+
+def ema_alpha(period: int) -> float:
+    """ضریب هموارسازی EMA برای یک دوره"""
+    return 2.0 / (period + 1.0)
+
+
+@njit(cache=True)
+def _argmin_skip(values, skip):
+    """اندیس کمینه (اولین وقوع)؛ اندیس skip مانند +inf در نظر گرفته می‌شود"""
+    best = 0
+    best_value = np.inf if skip == 0 else values[0]
+    for i in range(1, values.shape[0]):
+        if np.isnan(best_value):
+            break
+        x = np.inf if i == skip else values[i]
+        if x < best_value or np.isnan(x):
+            best = i
+            best_value = x
+    return best
+
+
+@njit(cache=True)
+def _argmax_skip(values, skip):
+    """اندیس بیشینه (اولین وقوع)؛ اندیس skip مانند -inf در نظر گرفته می‌شود"""
+    best = 0
+    best_value = -np.inf if skip == 0 else values[0]
+    for i in range(1, values.shape[0]):
+        if np.isnan(best_value):
+            break
+        x = -np.inf if i == skip else values[i]
+        if x > best_value or np.isnan(x):
+            best = i
+            best_value = x
+    return best
+
+
+@njit(cache=True)
+def divergence_code(close_tail, rsi_tail):
+    """
+    واگرایی قیمت و RSI روی پنجره آخر
+
+    Same test as detect_divergence applied to the whole of two equal
+    length tails: the lowest and second lowest (then highest and second
+    highest) closes, first occurrence on ties and NaN winning like
+    argmin/argmax.
+
+    Returns:
+        1 (bullish), -1 (bearish) or 0
+    """
+    lowest = _argmin_skip(close_tail, -1)
+    second_low = _argmin_skip(close_tail, lowest)
+    if close_tail[second_low] > close_tail[lowest] and \
+       rsi_tail[second_low] < rsi_tail[lowest]:
+        return 1
+
+    highest = _argmax_skip(close_tail, -1)
+    second_high = _argmax_skip(close_tail, highest)
+    if close_tail[second_high] < close_tail[highest] and \
+       rsi_tail[second_high] > rsi_tail[highest]:
+        return -1
+    return 0
+
+
+@njit(cache=True)
+def rolling_min_last(arr, window, end=0):
+    """
+    کمینه پنجره‌ای که در ``len(arr) - end`` تمام می‌شود
+
+    Same as ``rolling(window).min().iloc[-1 - end]``: NaN if the window is
+    incomplete or holds NaN.
+    """
+    stop = arr.shape[0] - end
+    if window <= 0 or stop < window:
+        return np.nan
+    out = arr[stop - window]
+    for i in range(stop - window, stop):
+        x = arr[i]
+        if np.isnan(x):
+            return np.nan
+        if x < out:
+            out = x
+    return out
+
+
+@njit(cache=True)
+def rolling_max_last(arr, window, end=0):
+    """بیشینه پنجره‌ای که در ``len(arr) - end`` تمام می‌شود"""
+    stop = arr.shape[0] - end
+    if window <= 0 or stop < window:
+        return np.nan
+    out = arr[stop - window]
+    for i in range(stop - window, stop):
+        x = arr[i]
+        if np.isnan(x):
+            return np.nan
+        if x > out:
+            out = x
+    return out
+
+
+@njit(cache=True)
+def rolling_mean_last(arr, window, end=0):
+    """میانگین پنجره‌ای که در ``len(arr) - end`` تمام می‌شود"""
+    stop = arr.shape[0] - end
+    if window <= 0 or stop < window:
+        return np.nan
+    total = 0.0
+    for i in range(stop - window, stop):
+        total += arr[i]
+    return total / window
+
+
+# Windows used by the breakout/crossover strategies
+VOLUME_AVG_WINDOW = 10
+STOP_WINDOW = 10
+BREAKOUT_WINDOW = 20
+
+
+@njit(cache=True)
+def _ema_crossover_kernel(close, high, low, volume, alpha_fast, alpha_slow, vol_mult):
+    """
+    کرنل ترکیبی استراتژی کراس EMA
+
+    ``alpha_fast``/``alpha_slow`` are the precomputed EMA smoothing factors.
+
+    Returns:
+        (signal_code, entry, sl_low, sl_high, ema_fast, ema_slow, ok) where
+        signal_code is 1 (long), -1 (short) or 0, sl_low/sl_high are the
+        recent low/high used for the stop and ok is False when the volume
+        filter rejected the bar (the other fields are then not computed)
+    """
+    n = close.shape[0]
+    avg_volume = rolling_mean_last(volume, VOLUME_AVG_WINDOW)
+    if volume[n - 1] < avg_volume * vol_mult:
+        return 0, np.nan, np.nan, np.nan, np.nan, np.nan, False
+
+    prev_fast, current_fast = _ema_last_two(close, alpha_fast)
+    prev_slow, current_slow = _ema_last_two(close, alpha_slow)
+
+    signal_code = 0
+    if prev_fast <= prev_slow and current_fast > current_slow:
+        signal_code = 1
+    elif prev_fast >= prev_slow and current_fast < current_slow:
+        signal_code = -1
+
+    return (signal_code, close[n - 1],
+            rolling_min_last(low, STOP_WINDOW), rolling_max_last(high, STOP_WINDOW),
+            current_fast, current_slow, True)
+
+
+@njit(parallel=True, cache=True)
+def eval_ema_crossover_multi(closes, highs, lows, volumes, fast_period, slow_period,
+                             vol_mult):
+    """
+    ارزیابی استراتژی کراس EMA روی چند نماد به صورت موازی
+
+    Each row is one symbol's bars, as EMACrossoverStrategy.generate_signal
+    sees them; shorter histories are padded with leading NaN. Rows are
+    evaluated on separate threads (prange). Inputs must be C-contiguous
+    ``(n_symbols, n_bars)`` float64 arrays.
+
+    Returns:
+        (signals, entries, stop_losses, take_profits, confidences): int8
+        codes 1 (long), -1 (short) or 0 and float64 values that are NaN
+        for rows without a signal
+    """
+    n_symbols, n_bars = closes.shape
+    signals = np.zeros(n_symbols, np.int8)
+    entries = np.full(n_symbols, np.nan)
+    stop_losses = np.full(n_symbols, np.nan)
+    take_profits = np.full(n_symbols, np.nan)
+    confidences = np.full(n_symbols, np.nan)
+    alpha_fast = 2.0 / (fast_period + 1.0)
+    alpha_slow = 2.0 / (slow_period + 1.0)
+
+    for s in prange(n_symbols):
+        close = closes[s]
+        start = 0
+        while start < n_bars and np.isnan(close[start]):
+            start += 1
+        if n_bars - start < slow_period + 5:
+            continue
+
+        code, entry, sl_low, sl_high, ema_fast, ema_slow, ok = _ema_crossover_kernel(
+            close, highs[s], lows[s], volumes[s], alpha_fast, alpha_slow, vol_mult)
+        if not ok or code == 0:
+            continue
+
+        if code == 1:
+            stop_loss = sl_low * 0.995
+            strong = ema_fast > ema_slow * 1.01
+        else:
+            stop_loss = sl_high * 1.005
+            strong = ema_fast < ema_slow * 0.99
+        signals[s] = code
+        entries[s] = entry
+        stop_losses[s] = stop_loss
+        take_profits[s] = entry + (entry - stop_loss) * 2.5
+        confidences[s] = 0.7 if strong else 0.5
+    return signals, entries, stop_losses, take_profits, confidences
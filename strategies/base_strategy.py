@@ -3,14 +3,115 @@ Base Strategy Class
 کلاس پایه برای تمام استراتژی‌ها
 """
 
+import functools
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from typing import Optional
+import numpy as np
 import pandas as pd
+from indicators.streaming import resume_position
+from ._indicator_cache import bar_key, bind
+
+
+# Leading fields of every strategy's signal namedtuple
+SIGNAL_FIELDS = ('signal', 'entry_price', 'stop_loss', 'take_profit', 'confidence')
+
+# Row layout of generate_signals_batch: signal is 1 (long), -1 (short) or
+# 0 (none); the float fields are NaN on bars without a signal
+SIGNAL_DTYPE = np.dtype([
+    ('signal', 'i1'),
+    ('entry', 'f8'),
+    ('sl', 'f8'),
+    ('tp', 'f8'),
+    ('confidence', 'f8'),
+])
+
+
+def _take_profit(entry_price, stop_loss, risk_reward_ratio):
+    """
+    حد سود از روی فاصله حد ضرر
+    
+    The stop sits on the losing side, so (entry - stop) already carries
+    the direction: above the entry for longs, below it for shorts. Works
+    element-wise on arrays as well as on floats.
+    """
+    return entry_price + (entry_price - stop_loss) * risk_reward_ratio
+
+
+def _empty_signals(n: int) -> np.ndarray:
+    """آرایه سیگنال خالی به طول n"""
+    out = np.zeros(n, dtype=SIGNAL_DTYPE)
+    for field in ('entry', 'sl', 'tp', 'confidence'):
+        out[field] = np.nan
+    return out
+
+
+def _fill_signals(out: np.ndarray, long: np.ndarray, short: np.ndarray,
+                 entry: np.ndarray, stop_long: np.ndarray, stop_short: np.ndarray,
+                 confidence: np.ndarray, risk_reward_ratio: float) -> np.ndarray:
+    """
+    پر کردن آرایه سیگنال از ماسک‌های long/short
+    
+    Take profit comes from _take_profit, as in generate_signal.
+    
+    Args:
+        out: آرایه با dtype برابر SIGNAL_DTYPE
+        long: ماسک کندل‌های long
+        short: ماسک کندل‌های short
+        entry: قیمت ورود هر کندل
+        stop_long: حد ضرر در صورت long
+        stop_short: حد ضرر در صورت short
+        confidence: اطمینان هر کندل
+        risk_reward_ratio: نسبت ریسک به پاداش
+        
+    Returns:
+        ``out``
+    """
+    hit = long | short
+    sl = np.where(long, stop_long, stop_short)[hit]
+    entry = entry[hit]
+    
+    out['signal'][long] = 1
+    out['signal'][short] = -1
+    out['entry'][hit] = entry
+    out['sl'][hit] = sl
+    out['tp'][hit] = _take_profit(entry, sl, risk_reward_ratio)
+    out['confidence'][hit] = confidence[hit]
+    return out
+
+
+def _memoize_signal(generate_signal):
+    """کش کردن نتیجه generate_signal برای کندل تکراری"""
+    @functools.wraps(generate_signal)
+    def _cached_generate_signal(self, df: pd.DataFrame) -> Optional[tuple]:
+        key = bar_key(df)
+        if key is not None and key == self._last_key:
+            return self._last_result
+        # A new bar: drop this frame's shared indicator values if stale
+        bind(df, key)
+        result = generate_signal(self, df)
+        self._last_key = key
+        self._last_result = result
+        return result
+    
+    return _cached_generate_signal
 
 
 class BaseStrategy(ABC):
     """کلاس پایه برای تمام استراتژی‌های معاملاتی"""
     
+    __slots__ = ('name', '_last_ts', '_last_close', '_last_key', '_last_result')
+    
+    # Longest gap of new bars _sync_state replays instead of reseeding
+    REPLAY_LIMIT = 64
+    
+    def __init_subclass__(cls, **kwargs):
+        """پیچیدن generate_signal زیرکلاس‌ها با کش کندل آخر"""
+        super().__init_subclass__(**kwargs)
+        generate_signal = cls.__dict__.get('generate_signal')
+        if generate_signal is not None and \
+           not getattr(generate_signal, '__isabstractmethod__', False):
+            cls.generate_signal = _memoize_signal(generate_signal)
+    
     def __init__(self, name: str):
         """
         Initialize strategy
@@ -19,27 +120,117 @@ class BaseStrategy(ABC):
             name: نام استراتژی
         """
         self.name = name
+        self._last_ts = None
+        self._last_close: Optional[float] = None
+        self._last_key: Optional[tuple] = None
+        self._last_result: Optional[tuple] = None
+    
+    def update(self, close: float, high: float, low: float, volume: float,
+               ts=None) -> None:
+        """
+        ثبت یک کندل بسته‌شده در وضعیت افزایشی استراتژی
+        
+        Args:
+            close: قیمت بسته شدن
+            high: بالاترین قیمت
+            low: پایین‌ترین قیمت
+            volume: حجم
+            ts: زمان کندل
+        """
+        self._update_state(close, high, low, volume)
+        self._last_ts = ts
+        self._last_close = close
+    
+    def _update_state(self, close: float, high: float, low: float,
+                      volume: float) -> None:
+        """به‌روزرسانی وضعیت داخلی با یک کندل (برای استراتژی‌های افزایشی)"""
+    
+    def _reset_state(self) -> None:
+        """پاک کردن وضعیت داخلی (برای استراتژی‌های افزایشی)"""
+    
+    def _seed_state(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    volume: np.ndarray) -> None:
+        """
+        ساخت وضعیت داخلی از کل تاریخچه ثبت‌شده
+        
+        Called after _reset_state with the bars to commit. This default
+        replays them through _update_state; incremental strategies override
+        it with vectorized kernels.
+        """
+        for i in range(len(close)):
+            self._update_state(close[i], high[i], low[i], volume[i])
+    
+    def _sync_state(self, index: pd.Index, close: np.ndarray, high: np.ndarray,
+                    low: np.ndarray, volume: np.ndarray) -> None:
+        """
+        همگام‌سازی وضعیت افزایشی با داده‌ها
+        
+        Every bar except the last is committed; the last one may still be
+        open and is left to ``peek``. A short continuation of the committed
+        history is replayed bar by bar; new data, or a gap longer than
+        ``REPLAY_LIMIT`` bars, rebuilds the state with _seed_state.
+        """
+        committed = len(close) - 1
+        pos = resume_position(index, close, committed, self._last_ts, self._last_close)
+        if pos >= 0 and committed - pos - 1 <= self.REPLAY_LIMIT:
+            for i in range(pos + 1, committed):
+                self.update(close[i], high[i], low[i], volume[i], index[i])
+            return
+        
+        self._reset_state()
+        self._last_ts = None
+        self._last_close = None
+        if committed > 0:
+            self._seed_state(close[:committed], high[:committed], low[:committed],
+                             volume[:committed])
+            self._last_ts = index[committed - 1]
+            self._last_close = close[committed - 1]
     
     @abstractmethod
-    def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
+    def generate_signal(self, df: pd.DataFrame) -> Optional[tuple]:
         """
         تولید سیگنال معاملاتی
         
+        Implementations must not mutate ``df``: the same frame is passed
+        to every strategy without copying. Derived data should live in
+        local NumPy arrays, not in new columns.
+        
+        Subclass implementations are memoized on the last bar (length,
+        first/last timestamp, last close and volume): a repeated call for
+        the same bar returns the previous result object.
+        
         Args:
-            df: DataFrame با داده‌های OHLCV
+            df: DataFrame با داده‌های OHLCV (فقط خواندنی)
             
         Returns:
-            Dictionary with signal info:
-            {
-                'signal': 'long' | 'short' | None,
-                'entry_price': float,
-                'stop_loss': float,
-                'take_profit': float,
-                'confidence': float (0-1)
-            }
+            None, or the strategy's signal namedtuple: the SIGNAL_FIELDS
+            (signal 'long' | 'short', entry_price, stop_loss, take_profit,
+            confidence in 0-1) followed by strategy-specific fields
         """
         pass
     
+    def generate_signals_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        تولید سیگنال برای تمام کندل‌ها در یک فراخوانی
+        
+        Row ``i`` holds what ``generate_signal(df.iloc[:i + 1])`` returns.
+        This default replays the bars one by one; strategies override it
+        with a vectorized pass.
+        
+        Args:
+            df: DataFrame با داده‌های OHLCV
+            
+        Returns:
+            Structured array with dtype SIGNAL_DTYPE, one row per bar
+        """
+        out = _empty_signals(len(df))
+        for i in range(len(df)):
+            signal = self.generate_signal(df.iloc[:i + 1])
+            if signal:
+                out[i] = (1 if signal.signal == 'long' else -1, signal.entry_price,
+                          signal.stop_loss, signal.take_profit, signal.confidence)
+        return out
+    
     @abstractmethod
     def calculate_stop_loss(self, df: pd.DataFrame, entry_price: float, 
                           signal: str) -> float:
@@ -4,10 +4,17 @@ Bollinger Bands Squeeze Breakout Strategy
 """
 
 import pandas as pd
-import numpy as np
-from typing import Optional, Dict
-from .base_strategy import BaseStrategy
-from indicators.technical_indicators import calculate_bollinger_bands, calculate_atr, calculate_macd
+from collections import namedtuple
+from typing import Optional
+from ._indicator_cache import get_or_compute, ohlcv_arrays
+from .base_strategy import SIGNAL_FIELDS, BaseStrategy, _take_profit
+from indicators.technical_indicators import calculate_atr_np
+from indicators.streaming import MacdCache
+from ._kernels import make_squeeze_kernel
+
+
+BollingerSqueezeSignal = namedtuple('BollingerSqueezeSignal',
+                                    SIGNAL_FIELDS + ('bb_width', 'atr_ratio'))
 
 
 class BollingerSqueezeStrategy(BaseStrategy):
@@ -16,6 +23,8 @@ class BollingerSqueezeStrategy(BaseStrategy):
     شناسایی دوره‌های آرامش قبل از طوفان
     """
     
+    __slots__ = ('bb_period', 'bb_std', 'atr_period', '_macd_state', '_kernel')
+    
     def __init__(self, bb_period: int = 20, bb_std: float = 2.0, 
                  atr_period: int = 14):
         """
@@ -30,32 +39,21 @@ class BollingerSqueezeStrategy(BaseStrategy):
         self.bb_period = bb_period
         self.bb_std = bb_std
         self.atr_period = atr_period
+        self._macd_state = MacdCache()
+        self._kernel = make_squeeze_kernel(bb_period, bb_std, atr_period)
     
-    def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
+    def generate_signal(self, df: pd.DataFrame) -> Optional[BollingerSqueezeSignal]:
         """
         تولید سیگنال بر اساس فشردگی و شکست باندهای بولینجر
         """
         if len(df) < max(self.bb_period, self.atr_period) + 20:
             return None
         
-        # Calculate indicators
-        bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(
-            df['close'], self.bb_period, self.bb_std
-        )
-        atr = calculate_atr(df['high'], df['low'], df['close'], self.atr_period)
-        macd, signal, _ = calculate_macd(df['close'])
+        close, high, low, volume = ohlcv_arrays(df)
         
-        current_price = df['close'].iloc[-1]
-        current_upper = bb_upper.iloc[-1]
-        current_lower = bb_lower.iloc[-1]
-        
-        # Check for squeeze (narrow bands)
-        bb_width = (current_upper - current_lower) / current_price
-        avg_bb_width = ((bb_upper - bb_lower) / df['close']).rolling(window=15).mean().iloc[-1]
-        
-        # Check for low ATR (low volatility)
-        current_atr = atr.iloc[-1]
-        avg_atr = atr.rolling(window=15).mean().iloc[-1]
+        (current_upper, current_lower, bb_width, avg_bb_width,
+         current_atr, avg_atr, vol_ma_last) = self._kernel(close, high, low, volume)
+        current_price = close[-1]
         
         # Squeeze condition: narrow bands and low ATR
         is_squeeze = bb_width < avg_bb_width * 0.7 and current_atr < avg_atr * 0.8
@@ -63,60 +61,59 @@ class BollingerSqueezeStrategy(BaseStrategy):
         if not is_squeeze:
             return None
         
+        # MACD is advanced incrementally; bars skipped by the squeeze gate
+        # are committed here on the next squeeze
+        current_macd, current_macd_signal, _ = self._macd_state.sync(df.index, close)
+        
         # Check for breakout
         signal = None
         entry_price = current_price
         confidence = 0.6
         
         # MACD confirmation
-        macd_above = macd.iloc[-1] > signal.iloc[-1]
-        macd_cross = macd.iloc[-1] > 0 if macd_above else macd.iloc[-1] < 0
+        macd_above = current_macd > current_macd_signal
+        macd_cross = current_macd > 0 if macd_above else current_macd < 0
+        
+        # Volume confirmation
+        high_volume = volume[-1] > vol_ma_last
         
         # Long: breakout above upper band with MACD confirmation
         if current_price > current_upper and macd_cross and macd_above:
             signal = 'long'
-            confidence = 0.8 if df['volume'].iloc[-1] > df['volume'].rolling(window=10).mean().iloc[-1] else 0.6
+            confidence = 0.8 if high_volume else 0.6
         
         # Short: breakdown below lower band with MACD confirmation
         elif current_price < current_lower and macd_cross and not macd_above:
             signal = 'short'
-            confidence = 0.8 if df['volume'].iloc[-1] > df['volume'].rolling(window=10).mean().iloc[-1] else 0.6
+            confidence = 0.8 if high_volume else 0.6
         
         if signal:
-            stop_loss = self.calculate_stop_loss(df, entry_price, signal)
-            take_profit = self.calculate_take_profit(entry_price, stop_loss)
+            stop_loss = self._stop_from_atr(entry_price, current_atr, signal)
+            take_profit = _take_profit(entry_price, stop_loss, 2.0)
             
-            return {
-                'signal': signal,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': confidence,
-                'bb_width': bb_width,
-                'atr_ratio': current_atr / avg_atr
-            }
+            return BollingerSqueezeSignal(signal, entry_price, stop_loss, take_profit,
+                                          confidence, bb_width, current_atr / avg_atr)
         
         return None
     
     def calculate_stop_loss(self, df: pd.DataFrame, entry_price: float,
                            signal: str) -> float:
         """محاسبه حد ضرر با استفاده از ATR"""
-        atr = calculate_atr(df['high'], df['low'], df['close'], self.atr_period)
-        current_atr = atr.iloc[-1]
-        
+        close, high, low, _ = ohlcv_arrays(df)
+        atr = get_or_compute(df, ('atr', self.atr_period),
+                             lambda: calculate_atr_np(high, low, close, self.atr_period))
+        return self._stop_from_atr(entry_price, atr[-1], signal)
+    
+    @staticmethod
+    def _stop_from_atr(entry_price: float, atr: float, signal: str) -> float:
+        """حد ضرر از روی مقدار ATR فعلی"""
         if signal == 'long':
-            return entry_price - (current_atr * 1.3)
+            return entry_price - (atr * 1.3)
         else:  # short
-            return entry_price + (current_atr * 1.3)
+            return entry_price + (atr * 1.3)
     
     def calculate_take_profit(self, entry_price: float, stop_loss: float,
                              risk_reward_ratio: float = 2.0) -> float:
         """محاسبه حد سود"""
-        risk = abs(entry_price - stop_loss)
-        reward = risk * risk_reward_ratio
-        
-        if entry_price > stop_loss:  # long
-            return entry_price + reward
-        else:  # short
-            return entry_price - reward
+        return _take_profit(entry_price, stop_loss, risk_reward_ratio)
 
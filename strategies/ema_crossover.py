@@ -4,9 +4,21 @@ EMA Crossover Strategy with Volume Confirmation
 """
 
 import pandas as pd
-from typing import Optional, Dict
-from .base_strategy import BaseStrategy
-from indicators.technical_indicators import calculate_ema
+import numpy as np
+from collections import namedtuple
+from typing import Optional, Tuple
+from ._indicator_cache import get_or_compute, ohlcv_arrays
+from .base_strategy import (
+    SIGNAL_FIELDS, BaseStrategy, _empty_signals, _fill_signals, _take_profit
+)
+from indicators.technical_indicators import calculate_ema_np, rolling_mean_np, rolling_minmax_np
+from indicators.streaming import EmaState
+from ._kernels import (
+    STOP_WINDOW, VOLUME_AVG_WINDOW, ema_alpha, eval_ema_crossover_multi
+)
+
+
+EMACrossoverSignal = namedtuple('EMACrossoverSignal', SIGNAL_FIELDS + ('ema_fast', 'ema_slow'))
 
 
 class EMACrossoverStrategy(BaseStrategy):
@@ -15,6 +27,9 @@ class EMACrossoverStrategy(BaseStrategy):
     ورود در کراس صعودی/نزولی با تایید حجم
     """
     
+    __slots__ = ('fast_period', 'slow_period', 'volume_multiplier',
+                 '_alpha_fast', '_alpha_slow', '_ema_fast', '_ema_slow')
+    
     def __init__(self, fast_period: int = 5, slow_period: int = 20,
                  volume_multiplier: float = 1.5):
         """
@@ -29,33 +44,56 @@ class EMACrossoverStrategy(BaseStrategy):
         self.fast_period = fast_period
         self.slow_period = slow_period
         self.volume_multiplier = volume_multiplier
+        # Smoothing factors depend only on the periods
+        self._alpha_fast = ema_alpha(fast_period)
+        self._alpha_slow = ema_alpha(slow_period)
+        self._ema_fast = EmaState(fast_period, self._alpha_fast)
+        self._ema_slow = EmaState(slow_period, self._alpha_slow)
+    
+    def _update_state(self, close: float, high: float, low: float,
+                      volume: float) -> None:
+        """ثبت یک کندل در EMAها"""
+        self._ema_fast.update(close)
+        self._ema_slow.update(close)
     
-    def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
+    def _reset_state(self) -> None:
+        """پاک کردن وضعیت افزایشی"""
+        self._ema_fast.reset()
+        self._ema_slow.reset()
+    
+    def _seed_state(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    volume: np.ndarray) -> None:
+        """ساخت EMAها از کل تاریخچه"""
+        self._ema_fast.seed(close)
+        self._ema_slow.seed(close)
+    
+    def generate_signal(self, df: pd.DataFrame) -> Optional[EMACrossoverSignal]:
         """
         تولید سیگنال بر اساس کراس EMA
         """
         if len(df) < self.slow_period + 5:
             return None
         
-        # Calculate EMAs
-        ema_fast = calculate_ema(df['close'], self.fast_period)
-        ema_slow = calculate_ema(df['close'], self.slow_period)
+        close, high, low, volume = ohlcv_arrays(df)
         
-        current_fast = ema_fast.iloc[-1]
-        current_slow = ema_slow.iloc[-1]
-        prev_fast = ema_fast.iloc[-2]
-        prev_slow = ema_slow.iloc[-2]
+        # Check volume first: the gate rejects most bars, and the skipped
+        # bars are committed by the next call that gets past it
+        avg_volume = get_or_compute(df, ('volume_mean', VOLUME_AVG_WINDOW),
+                                    lambda: volume[-VOLUME_AVG_WINDOW:].mean())
+        if volume[-1] < avg_volume * self.volume_multiplier:
+            return None
         
-        # Check volume
-        avg_volume = df['volume'].rolling(window=10).mean().iloc[-1]
-        current_volume = df['volume'].iloc[-1]
+        # Closed bars advance the incremental state; the last bar is peeked
+        self._sync_state(df.index, close, high, low, volume)
         
-        if current_volume < avg_volume * self.volume_multiplier:
-            return None
+        prev_fast = self._ema_fast.value
+        prev_slow = self._ema_slow.value
+        current_fast = self._ema_fast.peek(close[-1])
+        current_slow = self._ema_slow.peek(close[-1])
         
         # Check for crossover
         signal = None
-        entry_price = df['close'].iloc[-1]
+        entry_price = close[-1]
         confidence = 0.6
         
         # Bullish crossover: fast crosses above slow
@@ -69,40 +107,100 @@ class EMACrossoverStrategy(BaseStrategy):
             confidence = 0.7 if current_fast < current_slow * 0.99 else 0.5
         
         if signal:
-            stop_loss = self.calculate_stop_loss(df, entry_price, signal)
-            take_profit = self.calculate_take_profit(entry_price, stop_loss, 
-                                                     risk_reward_ratio=2.5)
+            # Tiny window: a slice reduction is cheaper than rolling state
+            stop_loss = self._stop_from_range(low[-STOP_WINDOW:].min(),
+                                              high[-STOP_WINDOW:].max(), signal)
+            take_profit = _take_profit(entry_price, stop_loss, 2.5)
             
-            return {
-                'signal': signal,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': confidence,
-                'ema_fast': current_fast,
-                'ema_slow': current_slow
-            }
+            return EMACrossoverSignal(signal, entry_price, stop_loss, take_profit,
+                                      confidence, current_fast, current_slow)
         
         return None
     
+    def generate_signals_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        سیگنال کراس EMA برای تمام کندل‌ها در یک گذر برداری
+        
+        Same result as calling generate_signal on every prefix of ``df``.
+        """
+        close, high, low, volume = ohlcv_arrays(df)
+        out = _empty_signals(len(close))
+        if len(close) < self.slow_period + 5:
+            return out
+        
+        ema_fast = get_or_compute(df, ('ema', self.fast_period),
+                                  lambda: calculate_ema_np(close, self.fast_period))
+        ema_slow = get_or_compute(df, ('ema', self.slow_period),
+                                  lambda: calculate_ema_np(close, self.slow_period))
+        prev_fast = np.empty_like(ema_fast)
+        prev_slow = np.empty_like(ema_slow)
+        prev_fast[0] = prev_slow[0] = np.nan
+        prev_fast[1:] = ema_fast[:-1]
+        prev_slow[1:] = ema_slow[:-1]
+        
+        avg_volume = get_or_compute(df, ('rolling_mean_volume', VOLUME_AVG_WINDOW),
+                                    lambda: rolling_mean_np(volume, VOLUME_AVG_WINDOW))
+        active = ~(volume < avg_volume * self.volume_multiplier)
+        active[:self.slow_period + 4] = False
+        
+        long = active & (prev_fast <= prev_slow) & (ema_fast > ema_slow)
+        short = active & ~long & (prev_fast >= prev_slow) & (ema_fast < ema_slow)
+        confidence = np.where(
+            long,
+            np.where(ema_fast > ema_slow * 1.01, 0.7, 0.5),
+            np.where(ema_fast < ema_slow * 0.99, 0.7, 0.5),
+        )
+        
+        recent_high, recent_low = get_or_compute(
+            df, ('rolling_minmax', STOP_WINDOW),
+            lambda: rolling_minmax_np(high, low, STOP_WINDOW))
+        return _fill_signals(out, long, short, close, recent_low * 0.995,
+                             recent_high * 1.005, confidence, 2.5)
+    
+    def generate_signals_multi(self, closes: np.ndarray, highs: np.ndarray,
+                               lows: np.ndarray,
+                               volumes: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        سیگنال کندل آخر چند نماد در یک فراخوانی موازی
+        
+        Row ``s`` gets what generate_signal returns for that symbol's bars.
+        The rows are evaluated in parallel, outside the GIL, and no
+        incremental state is used or changed.
+        
+        Args:
+            closes: آرایه (n_symbols, n_bars)؛ تاریخچه کوتاه‌تر با NaN در ابتدا
+            highs: بالاترین قیمت‌ها با همان شکل
+            lows: پایین‌ترین قیمت‌ها با همان شکل
+            volumes: حجم‌ها با همان شکل
+            
+        Returns:
+            (signals, entries, stop_losses, take_profits, confidences), see
+            eval_ema_crossover_multi
+        """
+        arrays = [np.ascontiguousarray(a, dtype=np.float64)
+                  for a in (closes, highs, lows, volumes)]
+        return eval_ema_crossover_multi(*arrays, self.fast_period, self.slow_period,
+                                        self.volume_multiplier)
+    
     def calculate_stop_loss(self, df: pd.DataFrame, entry_price: float,
                            signal: str) -> float:
         """محاسبه حد ضرر"""
+        # Only the last STOP_WINDOW bars are needed
+        _, high, low, _ = ohlcv_arrays(df)
+        recent_low = float(low[-STOP_WINDOW:].min())
+        recent_high = float(high[-STOP_WINDOW:].max())
+        return self._stop_from_range(recent_low, recent_high, signal)
+    
+    @staticmethod
+    def _stop_from_range(recent_low: float, recent_high: float, signal: str) -> float:
+        """حد ضرر از روی کف/سقف اخیر"""
         if signal == 'long':
-            recent_low = df['low'].rolling(window=10).min().iloc[-1]
             return recent_low * 0.995
         else:  # short
-            recent_high = df['high'].rolling(window=10).max().iloc[-1]
             return recent_high * 1.005
     
     def calculate_take_profit(self, entry_price: float, stop_loss: float,
                              risk_reward_ratio: float = 2.5) -> float:
         """محاسبه حد سود"""
-        risk = abs(entry_price - stop_loss)
-        reward = risk * risk_reward_ratio
-        
-        if entry_price > stop_loss:  # long
-            return entry_price + reward
-        else:  # short
-            return entry_price - reward
+        return _take_profit(entry_price, stop_loss, risk_reward_ratio)
 
@@ -4,9 +4,20 @@ RSI Divergence Strategy
 """
 
 import pandas as pd
-from typing import Optional, Dict
-from .base_strategy import BaseStrategy
-from indicators.technical_indicators import calculate_rsi, detect_divergence
+import numpy as np
+from collections import deque, namedtuple
+from typing import Optional
+from numpy.lib.stride_tricks import sliding_window_view
+from ._indicator_cache import get_or_compute, ohlcv_arrays
+from .base_strategy import (
+    SIGNAL_FIELDS, BaseStrategy, _empty_signals, _fill_signals, _take_profit
+)
+from indicators.technical_indicators import calculate_rsi_np, rolling_minmax_np
+from indicators.streaming import WilderRsiState
+from ._kernels import STOP_WINDOW, divergence_code
+
+
+RSIDivergenceSignal = namedtuple('RSIDivergenceSignal', SIGNAL_FIELDS + ('rsi',))
 
 
 class RSIDivergenceStrategy(BaseStrategy):
@@ -15,6 +26,11 @@ class RSIDivergenceStrategy(BaseStrategy):
     ورود در واگرایی صعودی/نزولی نزدیک سطوح کلیدی
     """
     
+    __slots__ = ('rsi_period', 'rsi_oversold', 'rsi_overbought', '_rsi', '_rsi_tail')
+    
+    # Bars compared by divergence_code
+    DIVERGENCE_LOOKBACK = 10
+    
     def __init__(self, rsi_period: int = 14, rsi_oversold: int = 30, 
                  rsi_overbought: int = 70):
         """
@@ -29,69 +45,144 @@ class RSIDivergenceStrategy(BaseStrategy):
         self.rsi_period = rsi_period
         self.rsi_oversold = rsi_oversold
         self.rsi_overbought = rsi_overbought
+        self._rsi = WilderRsiState(rsi_period)
+        # RSI of the closed bars inside the divergence lookback
+        self._rsi_tail = deque(maxlen=self.DIVERGENCE_LOOKBACK - 1)
+    
+    def _update_state(self, close: float, high: float, low: float,
+                      volume: float) -> None:
+        """ثبت یک کندل در RSI افزایشی"""
+        self._rsi_tail.append(self._rsi.update(close))
     
-    def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
+    def _reset_state(self) -> None:
+        """پاک کردن وضعیت افزایشی"""
+        self._rsi.reset()
+        self._rsi_tail.clear()
+    
+    def _seed_state(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                    volume: np.ndarray) -> None:
+        """ساخت RSI افزایشی و RSIهای اخیر از کل تاریخچه"""
+        self._rsi.seed(close)
+        rsi = calculate_rsi_np(close, self.rsi_period)
+        self._rsi_tail.extend(rsi[-self._rsi_tail.maxlen:])
+    
+    def generate_signal(self, df: pd.DataFrame) -> Optional[RSIDivergenceSignal]:
         """
         تولید سیگنال بر اساس واگرایی RSI
         """
         if len(df) < self.rsi_period + 20:
             return None
         
-        # Calculate RSI
-        rsi = calculate_rsi(df['close'], self.rsi_period)
-        current_rsi = rsi.iloc[-1]
+        close, high, low, volume = ohlcv_arrays(df)
+        
+        # Closed bars advance the incremental RSI; the last bar is peeked
+        self._sync_state(df.index, close, high, low, volume)
+        current_rsi = self._rsi.peek(close[-1])
         
-        # Detect divergence
-        divergence = detect_divergence(df['close'], rsi, lookback=10)
+        # Detect divergence on the last lookback bars only
+        rsi_tail = np.array([*self._rsi_tail, current_rsi])
+        divergence = divergence_code(close[-self.DIVERGENCE_LOOKBACK:], rsi_tail)
         
         signal = None
-        entry_price = df['close'].iloc[-1]
+        entry_price = close[-1]
         confidence = 0.0
         
         # Bullish divergence + oversold = Long signal
-        if divergence == 'bullish' and current_rsi < self.rsi_overbought:
+        if divergence == 1 and current_rsi < self.rsi_overbought:
             signal = 'long'
             confidence = 0.7 if current_rsi < self.rsi_oversold else 0.5
         
         # Bearish divergence + overbought = Short signal
-        elif divergence == 'bearish' and current_rsi > self.rsi_oversold:
+        elif divergence == -1 and current_rsi > self.rsi_oversold:
             signal = 'short'
             confidence = 0.7 if current_rsi > self.rsi_overbought else 0.5
         
         if signal:
-            stop_loss = self.calculate_stop_loss(df, entry_price, signal)
-            take_profit = self.calculate_take_profit(entry_price, stop_loss, 
-                                                     risk_reward_ratio=3.0)
+            stop_loss = self._stop_from_range(low[-STOP_WINDOW:].min(),
+                                              high[-STOP_WINDOW:].max(), signal)
+            take_profit = _take_profit(entry_price, stop_loss, 3.0)
             
-            return {
-                'signal': signal,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': confidence,
-                'rsi': current_rsi
-            }
+            return RSIDivergenceSignal(signal, entry_price, stop_loss, take_profit,
+                                       confidence, current_rsi)
         
         return None
     
+    def generate_signals_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        سیگنال واگرایی RSI برای تمام کندل‌ها در یک گذر برداری
+        
+        Same result as calling generate_signal on every prefix of ``df``;
+        the divergence test of detect_divergence is applied to every
+        lookback window at once.
+        """
+        close, high, low, _ = ohlcv_arrays(df)
+        n = len(close)
+        lookback = self.DIVERGENCE_LOOKBACK
+        out = _empty_signals(n)
+        if n < max(self.rsi_period + 20, lookback * 2):
+            return out
+        
+        rsi = get_or_compute(df, ('rsi', self.rsi_period),
+                             lambda: calculate_rsi_np(close, self.rsi_period))
+        windows = sliding_window_view(close, lookback)
+        rsi_windows = sliding_window_view(rsi, lookback)
+        rows = np.arange(len(windows))
+        
+        # First/second extremes per window, first occurrence on ties
+        masked = windows.copy()
+        lowest = masked.argmin(axis=1)
+        masked[rows, lowest] = np.inf
+        second_low = masked.argmin(axis=1)
+        masked[:] = windows
+        highest = masked.argmax(axis=1)
+        masked[rows, highest] = -np.inf
+        second_high = masked.argmax(axis=1)
+        
+        bullish = np.zeros(n, dtype=bool)
+        bearish = np.zeros(n, dtype=bool)
+        bullish[lookback - 1:] = (
+            (windows[rows, second_low] > windows[rows, lowest])
+            & (rsi_windows[rows, second_low] < rsi_windows[rows, lowest])
+        )
+        bearish[lookback - 1:] = (
+            (windows[rows, second_high] < windows[rows, highest])
+            & (rsi_windows[rows, second_high] > rsi_windows[rows, highest])
+        )
+        active = np.arange(n) >= max(self.rsi_period + 20, lookback * 2) - 1
+        
+        long = active & bullish & (rsi < self.rsi_overbought)
+        short = active & ~bullish & bearish & (rsi > self.rsi_oversold)
+        confidence = np.where(
+            long,
+            np.where(rsi < self.rsi_oversold, 0.7, 0.5),
+            np.where(rsi > self.rsi_overbought, 0.7, 0.5),
+        )
+        
+        recent_high, recent_low = get_or_compute(
+            df, ('rolling_minmax', STOP_WINDOW),
+            lambda: rolling_minmax_np(high, low, STOP_WINDOW))
+        return _fill_signals(out, long, short, close, recent_low * 0.98,
+                             recent_high * 1.02, confidence, 3.0)
+    
     def calculate_stop_loss(self, df: pd.DataFrame, entry_price: float,
                            signal: str) -> float:
         """محاسبه حد ضرر"""
+        # Only the last STOP_WINDOW bars are needed
+        _, high, low, _ = ohlcv_arrays(df)
+        recent_low = float(low[-STOP_WINDOW:].min())
+        recent_high = float(high[-STOP_WINDOW:].max())
+        return self._stop_from_range(recent_low, recent_high, signal)
+    
+    @staticmethod
+    def _stop_from_range(recent_low: float, recent_high: float, signal: str) -> float:
+        """حد ضرر از روی کف/سقف اخیر"""
         if signal == 'long':
-            recent_low = df['low'].rolling(window=10).min().iloc[-1]
             return recent_low * 0.98  # 2% below recent low
         else:  # short
-            recent_high = df['high'].rolling(window=10).max().iloc[-1]
             return recent_high * 1.02  # 2% above recent high
     
     def calculate_take_profit(self, entry_price: float, stop_loss: float,
                              risk_reward_ratio: float = 3.0) -> float:
         """محاسبه حد سود"""
-        risk = abs(entry_price - stop_loss)
-        reward = risk * risk_reward_ratio
-        
-        if entry_price > stop_loss:  # long
-            return entry_price + reward
-        else:  # short
-            return entry_price - reward
+        return _take_profit(entry_price, stop_loss, risk_reward_ratio)
 
@@ -5,8 +5,17 @@ Volume Confirmed Breakout Strategy
 
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict
-from .base_strategy import BaseStrategy
+from collections import namedtuple
+from typing import Optional
+from ._indicator_cache import get_or_compute, ohlcv_arrays
+from .base_strategy import (
+    SIGNAL_FIELDS, BaseStrategy, _empty_signals, _fill_signals, _take_profit
+)
+from indicators.technical_indicators import rolling_mean_np, rolling_minmax_np
+from ._kernels import STOP_WINDOW, VOLUME_AVG_WINDOW, BREAKOUT_WINDOW
+
+
+VolumeBreakoutSignal = namedtuple('VolumeBreakoutSignal', SIGNAL_FIELDS + ('volume_ratio',))
 
 
 class VolumeBreakoutStrategy(BaseStrategy):
@@ -15,6 +24,8 @@ class VolumeBreakoutStrategy(BaseStrategy):
     فقط روی شکست‌هایی تمرکز می‌کند که حجم معاملات حداقل 2-3 برابر میانگین باشد
     """
     
+    __slots__ = ('volume_multiplier',)
+    
     def __init__(self, volume_multiplier: float = 2.0):
         """
         Initialize strategy
@@ -25,27 +36,30 @@ class VolumeBreakoutStrategy(BaseStrategy):
         super().__init__("Volume Breakout")
         self.volume_multiplier = volume_multiplier
     
-    def generate_signal(self, df: pd.DataFrame) -> Optional[Dict]:
+    def generate_signal(self, df: pd.DataFrame) -> Optional[VolumeBreakoutSignal]:
         """
         تولید سیگنال بر اساس شکست با حجم بالا
         """
-        if len(df) < 20:
+        # The breakout levels need BREAKOUT_WINDOW bars before the current one
+        if len(df) < BREAKOUT_WINDOW + 1:
             return None
         
+        close, high, low, volume = ohlcv_arrays(df)
+        
         # Calculate average volume
-        avg_volume = df['volume'].rolling(window=10).mean().iloc[-1]
-        current_volume = df['volume'].iloc[-1]
+        avg_volume = get_or_compute(df, ('volume_mean', VOLUME_AVG_WINDOW),
+                                    lambda: volume[-VOLUME_AVG_WINDOW:].mean())
+        current_volume = volume[-1]
         
         # Check if volume is high enough
         if current_volume < avg_volume * self.volume_multiplier:
             return None
         
-        # Check for breakout above resistance (for long)
-        current_price = df['close'].iloc[-1]
-        recent_high = df['high'].rolling(window=20).max().iloc[-2]
-        
-        # Check for breakdown below support (for short)
-        recent_low = df['low'].rolling(window=20).min().iloc[-2]
+        # The windows are tiny, so plain slice reductions beat any rolling
+        # state; breakout levels end one bar before the current one
+        current_price = close[-1]
+        recent_high = high[-BREAKOUT_WINDOW - 1:-1].max()
+        recent_low = low[-BREAKOUT_WINDOW - 1:-1].min()
         
         signal = None
         entry_price = current_price
@@ -53,52 +67,87 @@ class VolumeBreakoutStrategy(BaseStrategy):
         # Long signal: price breaks above recent high with high volume
         if current_price > recent_high:
             signal = 'long'
-            entry_price = current_price
         
         # Short signal: price breaks below recent low with high volume
         elif current_price < recent_low:
             signal = 'short'
-            entry_price = current_price
         
         if signal:
-            stop_loss = self.calculate_stop_loss(df, entry_price, signal)
-            take_profit = self.calculate_take_profit(entry_price, stop_loss)
+            stop_loss = self._stop_from_range(low[-STOP_WINDOW:].min(),
+                                              high[-STOP_WINDOW:].max(), signal)
+            take_profit = _take_profit(entry_price, stop_loss, 2.0)
             
             # Calculate confidence based on volume ratio
             volume_ratio = current_volume / avg_volume
-            confidence = min(0.9, 0.5 + (volume_ratio - 2) * 0.1)
+            # Inline form of min(0.9, x), down to NaN giving 0.9
+            confidence = 0.5 + (volume_ratio - 2.0) * 0.1
+            confidence = confidence if confidence < 0.9 else 0.9
             
-            return {
-                'signal': signal,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': confidence,
-                'volume_ratio': volume_ratio
-            }
+            return VolumeBreakoutSignal(signal, entry_price, stop_loss, take_profit,
+                                        confidence, volume_ratio)
         
         return None
     
+    def generate_signals_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        سیگنال شکست با حجم برای تمام کندل‌ها در یک گذر برداری
+        
+        Same result as calling generate_signal on every prefix of ``df``.
+        """
+        close, high, low, volume = ohlcv_arrays(df)
+        out = _empty_signals(len(close))
+        if len(close) < 20:
+            return out
+        
+        avg_volume = get_or_compute(df, ('rolling_mean_volume', VOLUME_AVG_WINDOW),
+                                    lambda: rolling_mean_np(volume, VOLUME_AVG_WINDOW))
+        active = ~(volume < avg_volume * self.volume_multiplier)
+        active[:19] = False
+        
+        # Breakout levels end one bar before the current one
+        highest, lowest = get_or_compute(
+            df, ('rolling_minmax', BREAKOUT_WINDOW),
+            lambda: rolling_minmax_np(high, low, BREAKOUT_WINDOW))
+        resistance = np.empty_like(highest)
+        support = np.empty_like(lowest)
+        resistance[0] = support[0] = np.nan
+        resistance[1:] = highest[:-1]
+        support[1:] = lowest[:-1]
+        
+        long = active & (close > resistance)
+        short = active & ~long & (close < support)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / avg_volume
+        # fmin keeps the scalar path's NaN -> 0.9 of min(0.9, x)
+        confidence = np.fmin(0.9, 0.5 + (volume_ratio - 2.0) * 0.1)
+        
+        recent_high, recent_low = get_or_compute(
+            df, ('rolling_minmax', STOP_WINDOW),
+            lambda: rolling_minmax_np(high, low, STOP_WINDOW))
+        return _fill_signals(out, long, short, close, recent_low * 0.995,
+                             recent_high * 1.005, confidence, 2.0)
+    
     def calculate_stop_loss(self, df: pd.DataFrame, entry_price: float, 
                            signal: str) -> float:
         """محاسبه حد ضرر"""
+        # Only the last STOP_WINDOW bars are needed
+        _, high, low, _ = ohlcv_arrays(df)
+        recent_low = float(low[-STOP_WINDOW:].min())
+        recent_high = float(high[-STOP_WINDOW:].max())
+        return self._stop_from_range(recent_low, recent_high, signal)
+    
+    @staticmethod
+    def _stop_from_range(recent_low: float, recent_high: float, signal: str) -> float:
+        """حد ضرر از روی کف/سقف اخیر"""
         if signal == 'long':
             # Stop loss below recent low
-            recent_low = df['low'].rolling(window=10).min().iloc[-1]
             return recent_low * 0.995  # 0.5% below recent low
         else:  # short
-            recent_high = df['high'].rolling(window=10).max().iloc[-1]
             return recent_high * 1.005  # 0.5% above recent high
     
     def calculate_take_profit(self, entry_price: float, stop_loss: float,
                              risk_reward_ratio: float = 2.0) -> float:
         """محاسبه حد سود"""
-        risk = abs(entry_price - stop_loss)
-        reward = risk * risk_reward_ratio
-        
-        # For long: take profit above entry
-        if entry_price > stop_loss:
-            return entry_price + reward
-        else:  # short
-            return entry_price - reward
+        return _take_profit(entry_price, stop_loss, risk_reward_ratio)
 
@@ -0,0 +1,76 @@
+"""
+Batch vs prefix parity
+تطابق generate_signals_batch با generate_signal روی هر پیشوند
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from strategies import (
+    BollingerSqueezeStrategy,
+    EMACrossoverStrategy,
+    RSIDivergenceStrategy,
+    VolumeBreakoutStrategy,
+)
+from utils._njit import NUMBA_AVAILABLE
+
+STRATEGIES = [
+    VolumeBreakoutStrategy,
+    RSIDivergenceStrategy,
+    BollingerSqueezeStrategy,
+    EMACrossoverStrategy,
+]
+
+
+def _expected_rows(strategy, df):
+    """ردیف‌های مورد انتظار از generate_signal روی هر پیشوند"""
+    rows = []
+    for i in range(len(df)):
+        signal = strategy.generate_signal(df.iloc[:i + 1])
+        if signal is None:
+            rows.append((0, np.nan, np.nan, np.nan, np.nan))
+        else:
+            rows.append((1 if signal.signal == 'long' else -1, signal.entry_price,
+                         signal.stop_loss, signal.take_profit, signal.confidence))
+    return rows
+
+
+@pytest.mark.parametrize('strategy_cls', STRATEGIES, ids=lambda cls: cls.__name__)
+def test_batch_matches_prefix_replay(strategy_cls, ohlcv):
+    batch = strategy_cls().generate_signals_batch(ohlcv)
+    expected = _expected_rows(strategy_cls(), ohlcv)
+
+    assert len(batch) == len(ohlcv)
+    assert (batch['signal'] != 0).any()
+    codes = np.array([row[0] for row in expected])
+    np.testing.assert_array_equal(batch['signal'], codes)
+    for k, field in enumerate(('entry', 'sl', 'tp', 'confidence'), start=1):
+        values = np.array([row[k] for row in expected])
+        np.testing.assert_allclose(batch[field], values, rtol=1e-9, err_msg=field)
+
+
+def test_shared_instance_out_of_order(ohlcv):
+    """Incremental state must resync when prefixes are not consecutive."""
+    rng = np.random.default_rng(7)
+    ends = rng.integers(40, len(ohlcv) + 1, 60)
+    for strategy_cls in (RSIDivergenceStrategy, EMACrossoverStrategy):
+        shared = strategy_cls()
+        for end in ends:
+            frame = ohlcv.iloc[:end]
+            assert shared.generate_signal(frame) == strategy_cls().generate_signal(frame)
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason='already running without numba')
+def test_suite_without_numba():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, SHORT_LONG_NO_NUMBA='1')
+    result = subprocess.run(
+        [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+         '-k', 'not without_numba', os.path.join(root, 'tests')],
+        cwd=root, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,57 @@
+"""
+OHLCV cache fallback
+رفتار کش OHLCV وقتی دریافت داده از صرافی شکست می‌خورد
+"""
+
+import time
+
+import pytest
+
+import data_loader
+from data_loader import DataLoader
+
+HOUR_MS = 3600 * 1000
+
+
+class FakeExchange:
+    """صرافی ساختگی با کندل‌های ساعتی تا زمان حال"""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        if self.fail:
+            raise RuntimeError("exchange unavailable")
+        now = int(time.time() * 1000) // HOUR_MS * HOUR_MS
+        start = max(since, now - 3 * HOUR_MS)
+        return [[t, 1.0, 2.0, 0.5, 1.5, 10.0] for t in range(start, now + 1, HOUR_MS)]
+
+
+def _frozen_datetime(timestamp):
+    """datetime با now() ثابت"""
+    class Frozen(data_loader.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return data_loader.datetime.fromtimestamp(timestamp, tz)
+    return Frozen
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader.time, 'sleep', lambda seconds: None)
+    loader = DataLoader(cache_dir=str(tmp_path))
+    loader.exchange = FakeExchange()
+    assert not loader.get_ohlcv('BTC/USDT', '1h', days=1).empty
+    loader.exchange.fail = True
+    return loader
+
+
+def test_failed_fetch_returns_current_cache(loader):
+    assert len(loader.get_ohlcv('BTC/USDT', '1h', days=1)) == 4
+
+
+def test_failed_fetch_ignores_stale_cache(loader, monkeypatch):
+    later = time.time() + 5 * 3600
+    monkeypatch.setattr(data_loader, 'datetime', _frozen_datetime(later))
+    assert loader.get_ohlcv('BTC/USDT', '1h', days=1).empty
+
@@ -0,0 +1,62 @@
+"""
+Indicator cache invalidation
+بی‌اعتبار شدن کش اندیکاتورها پس از تغییر درجای داده و ستون‌های غیرپیوسته
+"""
+
+import numpy as np
+import pandas as pd
+
+from strategies import (
+    BollingerSqueezeStrategy,
+    EMACrossoverStrategy,
+    RSIDivergenceStrategy,
+    VolumeBreakoutStrategy,
+)
+
+from conftest import make_ohlcv
+
+
+def _mutate_tail(df, bars=50):
+    """تغییر درجای قیمت‌های آخر، مانند DataLoader._apply_candle"""
+    column = df.columns.get_loc('close')
+    df.iloc[-bars:, column] = df['close'].to_numpy()[-bars:] * 1.03
+
+
+def test_batch_sees_in_place_update():
+    df = make_ohlcv(1)
+    strategy = EMACrossoverStrategy(volume_multiplier=0)
+    strategy.generate_signals_batch(df)
+
+    _mutate_tail(df)
+    result = strategy.generate_signals_batch(df)
+    expected = EMACrossoverStrategy(volume_multiplier=0).generate_signals_batch(df.copy())
+    for field in result.dtype.names:
+        np.testing.assert_array_equal(result[field], expected[field], err_msg=field)
+
+
+def test_stop_loss_sees_in_place_update():
+    df = make_ohlcv(2)
+    strategy = VolumeBreakoutStrategy()
+    before = strategy.calculate_stop_loss(df, 100.0, 'long')
+
+    column = df.columns.get_loc('low')
+    df.iloc[-1, column] = df['low'].iat[-1] - 5.0
+    df.iloc[-1, df.columns.get_loc('close')] = df['close'].iat[-1] - 5.0
+    after = strategy.calculate_stop_loss(df, 100.0, 'long')
+    assert after == VolumeBreakoutStrategy().calculate_stop_loss(df.copy(), 100.0, 'long')
+    assert after < before
+
+
+def test_strided_columns():
+    """Frames built from a 2-D slice may hold strided column views."""
+    source = make_ohlcv(3)
+    columns = ['open', 'high', 'low', 'close', 'volume']
+    block = np.column_stack([np.arange(len(source))] +
+                            [source[c].to_numpy() for c in columns])
+    strided = pd.DataFrame(block[:, 1:], columns=columns, index=source.index, copy=False)
+    for strategy_cls in (BollingerSqueezeStrategy, EMACrossoverStrategy,
+                         RSIDivergenceStrategy, VolumeBreakoutStrategy):
+        for end in range(60, len(strided), 25):
+            frame = strided.iloc[:end]
+            expected = strategy_cls().generate_signal(source[columns].iloc[:end].copy())
+            assert strategy_cls().generate_signal(frame) == expected
@@ -0,0 +1,54 @@
+"""
+Multi-symbol vs single-symbol parity
+تطابق generate_signals_multi با generate_signal برای هر نماد
+"""
+
+import numpy as np
+import pytest
+
+from strategies import EMACrossoverStrategy
+
+from conftest import make_ohlcv
+
+COLUMNS = ('close', 'high', 'low', 'volume')
+
+
+def _stack(frames):
+    """آرایه‌های (n_symbols, n_bars) با NaN در ابتدای تاریخچه‌های کوتاه‌تر"""
+    n_bars = max(len(df) for df in frames)
+    arrays = []
+    for column in COLUMNS:
+        out = np.full((len(frames), n_bars), np.nan)
+        for row, df in enumerate(frames):
+            out[row, n_bars - len(df):] = df[column].to_numpy()
+        arrays.append(out)
+    return arrays
+
+
+@pytest.mark.parametrize('volume_multiplier', [1.5, 0.0])
+def test_multi_matches_single(volume_multiplier):
+    symbols = [make_ohlcv(seed, 400 + 37 * seed) for seed in range(8)]
+    strategy = EMACrossoverStrategy(volume_multiplier=volume_multiplier)
+    hits = 0
+    for end in range(20, 400, 7):
+        # Different history lengths exercise the NaN padding
+        frames = [df.iloc[:end - row % 3] for row, df in enumerate(symbols)]
+        signals, entries, stops, targets, confidences = \
+            strategy.generate_signals_multi(*_stack(frames))
+
+        for row, df in enumerate(frames):
+            expected = EMACrossoverStrategy(volume_multiplier=volume_multiplier) \
+                .generate_signal(df)
+            if expected is None:
+                assert signals[row] == 0
+                assert np.isnan(entries[row])
+                continue
+            hits += 1
+            assert signals[row] == (1 if expected.signal == 'long' else -1)
+            np.testing.assert_allclose(
+                [entries[row], stops[row], targets[row], confidences[row]],
+                [expected.entry_price, expected.stop_loss, expected.take_profit,
+                 expected.confidence],
+                rtol=1e-12,
+            )
+    assert hits > 0
@@ -0,0 +1,64 @@
+"""
+Volume profile regression tests
+مقایسه calculate_volume_profile با نسخه حلقه‌ای اولیه
+"""
+
+import pandas as pd
+
+from indicators.technical_indicators import calculate_volume_profile
+
+from conftest import make_ohlcv
+
+
+def _loop_profile(df, bins=20):
+    """نسخه اولیه با iterrows، به عنوان مرجع"""
+    price_range = df['high'].max() - df['low'].min()
+    bin_size = price_range / bins
+    volume_profile = {}
+    for _, row in df.iterrows():
+        for i in range(bins):
+            bin_price = df['low'].min() + (i * bin_size)
+            if row['low'] <= bin_price <= row['high']:
+                volume_profile[bin_price] = volume_profile.get(bin_price, 0) + row['volume']
+    poc = max(volume_profile, key=volume_profile.get) if volume_profile else None
+    return volume_profile, poc
+
+
+def _assert_matches_loop(df, bins=20):
+    result = calculate_volume_profile(df, bins)
+    profile, poc = _loop_profile(df, bins)
+    assert list(result['profile'].items()) == list(profile.items())
+    assert result['poc'] == poc
+
+
+def test_matches_loop(ohlcv):
+    _assert_matches_loop(ohlcv.iloc[:300])
+
+
+def test_poc_tie_keeps_first_visited_bin():
+    # Bins 11 and 10 both end with volume 2; bin 11 was filled first, so it
+    # is the POC even though 10 is the lower price
+    df = pd.DataFrame({'high': [10.0, 12.0, 10.0], 'low': [10.0, 11.0, 8.0],
+                       'volume': [1.0, 2.0, 1.0]})
+    df = df.iloc[[1, 0, 2]]
+    result = calculate_volume_profile(df, bins=4)
+    assert list(result['profile']) == [11.0, 10.0, 8.0, 9.0]
+    assert result['poc'] == 11.0
+    _assert_matches_loop(df, bins=4)
+
+
+def test_flat_prices_collapse_to_one_bin():
+    # With no price range every bin has the same price, which the loop
+    # adds to once per bin
+    df = make_ohlcv(1, n=30)
+    df[['high', 'low']] = 50.0
+    result = calculate_volume_profile(df, bins=20)
+    assert list(result['profile']) == [50.0]
+    assert result['poc'] == 50.0
+    _assert_matches_loop(df, bins=20)
+
+
+def test_empty_frame():
+    df = pd.DataFrame({'high': [], 'low': [], 'volume': []}, dtype=float)
+    result = calculate_volume_profile(df)
+    assert result['profile'] == {} and result['poc'] is None
@@ -0,0 +1,53 @@
+"""
+Optional Numba support
+پشتیبانی اختیاری از Numba
+
+If numba is installed, ``njit`` and ``prange`` are numba's. Otherwise
+``njit`` is a no-op and ``prange`` is ``range``, so the kernels still run
+as plain (serial) Python/NumPy.
+"""
+
+try:
+    from numba import njit, prange, types
+    NUMBA_AVAILABLE = True
+    # Contiguous 1-D float64 inputs: writable, and read-only as returned
+    # by to_numpy() under pandas copy-on-write
+    FLOAT_ARRAYS = (types.float64[::1], types.Array(types.float64, 1, 'C', readonly=True))
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+    types = None
+    FLOAT_ARRAYS = ()
+    prange = range
+
+    def njit(_func=None, *args, **kwargs):
+        """جایگزین بی‌اثر برای numba.njit"""
+        def decorator(func):
+            return func
+
+        # njit(func), or njit(signatures, **options) used as a decorator
+        if callable(_func):
+            return decorator(_func)
+        return decorator
+
+
+def array_signatures(build):
+    """
+    امضاهای Numba برای هر نوع آرایه ورودی float64
+
+    Passing the signatures to ``njit`` compiles the kernel when the module
+    is imported (or loads it from the cache), so the first bar does not pay
+    the JIT latency. Callers must pass contiguous arrays
+    (``np.ascontiguousarray``).
+
+    Args:
+        build: ``build(types, array_type)`` returning one signature
+
+    Returns:
+        List of signatures, or None without numba
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    return [build(types, array_type) for array_type in FLOAT_ARRAYS]
+
+
+__all__ = ['njit', 'prange', 'array_signatures', 'NUMBA_AVAILABLE']